@@ -1,13 +1,9 @@
 import time
 from datetime import datetime
-from tkinter.tix import Tree
 import yfinance as yf
 import pandas as pd
-from pypfopt import EfficientFrontier
-from pypfopt import risk_models
-from pypfopt import expected_returns
-from datetime import timedelta
-from datetime import date
+from checkpoint import run_chunked, read_chunks, fingerprint
+from max_sharpe import max_sharpe_weights, clean_weights, rolling_mean_historical_return_and_cov
 
 date_format = "%Y-%m-%d"
 
@@ -31,31 +27,41 @@ for symbol in symbols:
     else:
         df = pd.concat([df, data[symbol]], axis=1)
 
-results = []
+df = df.dropna()
+df.columns = symbols
+
 window_size = 240*10
+# Finished window ranges are checkpointed here; rerunning the script resumes
+# after the last finished chunk instead of starting over.
+chunk_size = 250
+checkpoint_dir = f"{'_'.join(symbols)}_{window_size}_checkpoints"
+
+prices = df.values
 
-for i in range(len(df.index)):
-    if i+window_size > len(df.index):
-        continue
+def scan(start, stop):
+    # Sample statistics of every window starting in [start, stop)
+    mu, S = rolling_mean_historical_return_and_cov(prices, window_size, start, stop)
 
-    df_window = df[i:i+window_size]
+    # Skip windows where every symbol ended below where it started
+    first = prices[start:stop]
+    last = prices[start + window_size - 1:stop + window_size - 1]
+    skip = (first > last).all(axis=1)
 
-    if df_window['IOO'][0] > df_window['IOO'][-1] and df_window['BLK'][0] > df_window['BLK'][-1]:
-        continue
+    # Optimize for maximal Sharpe ratio; windows without a solution are NaN
+    weights = clean_weights(max_sharpe_weights(mu, S))
+    result = pd.DataFrame(weights, index=df.index[start:stop], columns=symbols)
+    return result[~skip].dropna()
 
-    # Calculate expected returns and sample covariance
-    mu = expected_returns.mean_historical_return(df_window)
-    S = risk_models.sample_cov(df_window)
+# Adjusted prices are restated after every dividend; chunks whose input
+# changed since they were written are recomputed.
+def input_fingerprint(start, stop):
+    end = stop + window_size - 1
+    return fingerprint(df.index.values[start:end], prices[start:end])
 
-    # Optimize for maximal Sharpe ratio
-    ef = EfficientFrontier(mu, S)
-    try:
-        raw_weights = ef.max_sharpe()
-    except:
-        continue
-    cleaned_weights = ef.clean_weights()
-    results.append(cleaned_weights)
+run_chunked(checkpoint_dir, len(df.index) - window_size + 1, chunk_size, scan,
+            parameters={'symbols': symbols, 'window_size': window_size,
+                        'start': start_str, 'consider_dividends': consider_dividends},
+            input_fingerprint=input_fingerprint)
 
-df_result = pd.DataFrame(results)
-df_result.describe()
-pass
\ No newline at end of file
+df_result = read_chunks(checkpoint_dir)
+print(df_result.describe())
@@ -0,0 +1,165 @@
+#!/usr/local/bin/python3
+
+from concurrent.futures import ProcessPoolExecutor
+import sys
+import time
+import numpy as np
+import pandas as pd
+from inverse_volatility_backtest import download_prices, inverse_volatility_weights, NUM_TRADING_DAYS_PER_YEAR
+from max_sharpe import max_sharpe_weights, mean_historical_return, sample_cov
+
+# ------------------------------
+# Parameters Setting
+# ------------------------------
+SYMBOLS = ['UPRO', 'TMF']
+START_DATE = "2024-01-01"
+END_DATE = "2025-01-01"
+CONSIDER_DIVIDENDS = False
+
+NUM_PATHS = 5000          # number of resampled return paths
+BLOCK_SIZE = 10           # consecutive days kept together to preserve autocorrelation
+CHUNK_SIZE = 500          # paths generated and solved per task
+SEED = 42
+PROCESSES = None          # worker processes, None uses every core
+LOSS_ONLY = False
+
+RISK_PARITY_ITERATIONS = 50
+RISK_PARITY_TOLERANCE = 1e-10
+
+# ------------------------------
+# Resampling
+# ------------------------------
+def block_bootstrap(returns, num_paths, block_size, rng):
+    """
+    Moving block bootstrap of a (T x N) return matrix. Returns a
+    (num_paths x T x N) array built from randomly chosen blocks of
+    `block_size` consecutive days; all symbols share the same days so the
+    cross-sectional correlation is kept.
+    """
+    num_days = returns.shape[0]
+    block_size = min(block_size, num_days)
+    num_blocks = -(-num_days // block_size)
+    starts = rng.integers(0, num_days - block_size + 1, size=(num_paths, num_blocks))
+    index = (starts[:, :, None] + np.arange(block_size)).reshape(num_paths, -1)[:, :num_days]
+    return returns[index]
+
+# ------------------------------
+# Batched Allocations
+# ------------------------------
+def inverse_volatility_weights_batch(paths, loss_only=LOSS_ONLY):
+    """
+    Inverse volatility weights for every path of a (B x T x N) return array.
+    """
+    if loss_only:
+        paths = np.where(paths <= 0, paths, np.nan)
+        volatility = np.nanstd(paths, axis=1, ddof=1)
+    else:
+        volatility = np.std(paths, axis=1, ddof=1)
+    return inverse_volatility_weights(volatility * np.sqrt(NUM_TRADING_DAYS_PER_YEAR))
+
+
+def risk_parity_weights_batch(covariances, assets_risk_budget=None,
+                              iterations=RISK_PARITY_ITERATIONS, tolerance=RISK_PARITY_TOLERANCE):
+    """
+    Long-only risk budgeting weights for a stack of (B x N x N) covariance
+    matrices, the batched counterpart of `risk_parity.get_weights`.
+
+    Instead of one SLSQP run per matrix, every problem is solved at once with
+    damped Newton steps on the convex formulation
+        min 0.5 * y' S y - sum(b * log(y)),  y > 0
+    whose solution, normalized to sum to one, has risk contributions equal to
+    the budget b.
+    """
+    covariances = np.asarray(covariances, dtype=np.float64)
+    num_assets = covariances.shape[-1]
+    if assets_risk_budget is None:
+        assets_risk_budget = np.full(num_assets, 1.0 / num_assets)
+    budget = np.asarray(assets_risk_budget, dtype=np.float64)
+
+    y = budget / np.sqrt(np.diagonal(covariances, axis1=-2, axis2=-1))
+    eye = np.eye(num_assets)
+    for _ in range(iterations):
+        gradient = np.einsum('bij,bj->bi', covariances, y) - budget / y
+        if np.abs(gradient * y).max() < tolerance:
+            break
+        hessian = covariances + eye * (budget / (y * y))[:, None, :]
+        step = np.linalg.solve(hessian, gradient[:, :, None])[:, :, 0]
+        # Shorten the step where needed so that y stays strictly positive.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            limit = np.where(step > 0, y / step, np.inf).min(axis=1)
+        alpha = np.minimum(1.0, 0.9 * limit)
+        y = y - alpha[:, None] * step
+
+    return y / y.sum(axis=1, keepdims=True)
+
+# ------------------------------
+# Parallel Driver
+# ------------------------------
+def _resample_chunk(returns, num_paths, block_size, seed_sequence, loss_only):
+    rng = np.random.default_rng(seed_sequence)
+    paths = block_bootstrap(returns, num_paths, block_size, rng)
+    covariances = sample_cov(paths, returns_data=True)
+    return {
+        'inverse_volatility': inverse_volatility_weights_batch(paths, loss_only),
+        'risk_parity': risk_parity_weights_batch(covariances),
+        'max_sharpe': max_sharpe_weights(mean_historical_return(paths, returns_data=True), covariances),
+    }
+
+
+def bootstrap_weights(returns, num_paths=NUM_PATHS, block_size=BLOCK_SIZE, seed=SEED,
+                      chunk_size=CHUNK_SIZE, processes=PROCESSES, loss_only=LOSS_ONLY):
+    """
+    Resample `returns` into `num_paths` paths and compute every allocation on
+    each of them. Work is split into chunks of `chunk_size` paths that run on a
+    process pool; each chunk gets its own child of one SeedSequence, so the
+    result only depends on `seed` and `chunk_size`, not on the number of
+    processes. Returns a dict of allocation name -> (num_paths x N) weights.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    sizes = [min(chunk_size, num_paths - start) for start in range(0, num_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(_resample_chunk, returns, size, block_size, seed_sequence, loss_only)
+                   for size, seed_sequence in zip(sizes, seeds)]
+        chunks = [future.result() for future in futures]
+
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+
+def summarize(weights, symbols, percentiles=(5, 25, 50, 75, 95)):
+    """
+    Distribution of one allocation's weights as a DataFrame, one row per symbol.
+    Paths without a solution (NaN rows) are left out.
+    """
+    weights = weights[np.isfinite(weights).all(axis=1)]
+    summary = pd.DataFrame(np.percentile(weights, percentiles, axis=0).T,
+                           index=symbols, columns=[f'{p}%' for p in percentiles])
+    summary.insert(0, 'std', weights.std(axis=0, ddof=1))
+    summary.insert(0, 'mean', weights.mean(axis=0))
+    return summary
+
+# ------------------------------
+# Main Execution Flow
+# ------------------------------
+def main():
+    symbols = SYMBOLS
+    if len(sys.argv) > 1:
+        symbols = [s.strip().upper() for s in sys.argv[1].split(',')]
+
+    prices = download_prices(symbols, START_DATE, END_DATE, CONSIDER_DIVIDENDS)
+    returns = prices.pct_change().iloc[1:].values
+
+    begin = time.perf_counter()
+    weights = bootstrap_weights(returns)
+    elapsed = time.perf_counter() - begin
+
+    print("Portfolio: {}, from {} to {}, {} paths of {} days (block size {})".format(
+        str(symbols), START_DATE, END_DATE, NUM_PATHS, len(returns), BLOCK_SIZE))
+    for name, w in weights.items():
+        print(f"\n{name} weights:")
+        print((summarize(w, symbols) * 100).round(2).to_string())
+    print(f"\nResampled in {elapsed:.2f} s")
+
+if __name__ == "__main__":
+    main()
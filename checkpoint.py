@@ -0,0 +1,169 @@
+from concurrent.futures import as_completed
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# ------------------------------
+# Chunked, Resumable Scans
+# ------------------------------
+# A scan over `num_items` items (e.g. rolling window start positions) is cut
+# into ranges of `chunk_size`. Each finished range is written as its own
+# Parquet file named after the range, so the directory only ever grows and a
+# rerun skips every range that already has a file. Files are written under a
+# temporary name and renamed, so a crash never leaves a half-written chunk.
+# Ranges are aligned to multiples of `chunk_size`, so when the input grows only
+# the last, partial range is recomputed.
+#
+# Parameters only describe the scan, not its input. When the input can change
+# under the same parameters (e.g. an adjusted price history restated after a
+# dividend), pass an `input_fingerprint(start, stop)` of the data each range
+# reads; ranges whose fingerprint changed are recomputed. Fingerprints are kept
+# per range start, for the chunks on disk only.
+
+PARAMETERS_FILE = 'parameters.json'
+FINGERPRINTS_FILE = 'fingerprints.json'
+
+
+def chunk_path(directory, start, stop):
+    return os.path.join(directory, f'{start:010d}_{stop:010d}.parquet')
+
+
+def completed_ranges(directory):
+    """
+    Sorted list of (start, stop) ranges that already have a checkpoint file.
+    """
+    if not os.path.isdir(directory):
+        return []
+    ranges = []
+    for name in os.listdir(directory):
+        if name.endswith('.parquet'):
+            start, stop = name[:-len('.parquet')].split('_')
+            ranges.append((int(start), int(stop)))
+    return sorted(ranges)
+
+
+def open_checkpoint(directory, parameters):
+    """
+    Create the checkpoint directory, or check that an existing one was written
+    with the same scan parameters. Resuming with different parameters would mix
+    incompatible results, so it raises ValueError instead.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, PARAMETERS_FILE)
+    parameters = json.loads(json.dumps(parameters))
+    if os.path.exists(path):
+        with open(path) as file:
+            saved = json.load(file)
+        if saved != parameters:
+            raise ValueError(f"checkpoint {directory} was written with parameters {saved}, not {parameters}")
+    else:
+        with open(path, 'w') as file:
+            json.dump(parameters, file, indent=2)
+
+
+def fingerprint(*arrays):
+    """
+    Hash of the contents of some arrays, e.g. the prices a range reads.
+    """
+    digest = hashlib.sha1()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.dtype, array.shape)).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def read_fingerprints(directory):
+    path = os.path.join(directory, FINGERPRINTS_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+def write_fingerprints(directory, fingerprints):
+    path = os.path.join(directory, FINGERPRINTS_FILE)
+    with open(path + '.tmp', 'w') as file:
+        json.dump(fingerprints, file, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def write_chunk(directory, start, stop, df):
+    path = chunk_path(directory, start, stop)
+    df.to_parquet(path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+def read_chunks(directory):
+    """
+    Concatenate every finished chunk in scan order.
+    """
+    frames = [pd.read_parquet(chunk_path(directory, start, stop)) for start, stop in completed_ranges(directory)]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames)
+
+
+def iter_chunks(directory):
+    """
+    Yield finished chunks one at a time, in scan order, for aggregations that
+    should not load every result at once.
+    """
+    for start, stop in completed_ranges(directory):
+        yield pd.read_parquet(chunk_path(directory, start, stop))
+
+
+def run_chunked(directory, num_items, chunk_size, compute, parameters=None, verbose=True, executor=None,
+                input_fingerprint=None):
+    """
+    Run `compute(start, stop)` -> DataFrame for every range of `chunk_size`
+    items not yet in `directory`, checkpointing each result as soon as it is
+    done. Use `read_chunks` or `iter_chunks` to load the results afterwards.
+
+    With an `input_fingerprint(start, stop)` -> str of the input a range reads,
+    finished ranges whose fingerprint changed are computed again. Chunks
+    beyond `num_items` (left by a longer input) are removed.
+
+    With an `executor` (e.g. a ProcessPoolExecutor) the missing ranges are
+    computed in parallel and each one is written as soon as it finishes;
+    `compute` must then be picklable. Without one, only one chunk is held in
+    memory at a time.
+    """
+    open_checkpoint(directory, {'chunk_size': chunk_size, **(parameters or {})})
+    done = dict(completed_ranges(directory))
+    for start in [start for start in done if start >= num_items]:
+        os.remove(chunk_path(directory, start, done.pop(start)))
+
+    saved = {key: value for key, value in read_fingerprints(directory).items()
+             if key.isdigit() and int(key) in done}
+    todo = []
+    expected = {}
+    for start in range(0, num_items, chunk_size):
+        stop = min(start + chunk_size, num_items)
+        if input_fingerprint is not None:
+            expected[start] = input_fingerprint(start, stop)
+        if done.get(start) != stop or (input_fingerprint is not None and saved.get(str(start)) != expected[start]):
+            todo.append((start, stop))
+    if input_fingerprint is not None:
+        write_fingerprints(directory, saved)
+
+    def finish(start, stop, df):
+        write_chunk(directory, start, stop, df)
+        if start in done and done[start] != stop:
+            os.remove(chunk_path(directory, start, done[start]))
+        if input_fingerprint is not None:
+            saved[str(start)] = expected[start]
+            write_fingerprints(directory, saved)
+        if verbose:
+            print(f"checkpointed {start}-{stop} of {num_items}")
+
+    if executor is None:
+        for start, stop in todo:
+            finish(start, stop, compute(start, stop))
+        return
+
+    futures = {executor.submit(compute, start, stop): (start, stop) for start, stop in todo}
+    for future in as_completed(futures):
+        finish(*futures[future], future.result())
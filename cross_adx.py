@@ -1,7 +1,9 @@
 import pandas as pd
 import numpy as np
 import yfinance as yf
-import matplotlib.pyplot as plt
+from portfolio_metrics import summary, format_summary
+from periods import period_ends
+import plotting
 
 # ------------------------------
 # 參數設定
@@ -19,6 +21,12 @@ STOP_LOSS_RATE = 0.08     # 停損比例：8%
 INITIAL_CAPITAL = 100000  # 初始本金
 TRADE_SIZE = 1            # 每次交易數量
 
+TIMEFRAMES = ['D', 'W-FRI', 'M']  # 日線、週線 (週五收盤)、月線，一次回測
+PERIODS_PER_YEAR = {'D': 252, 'W-FRI': 52, 'M': 12}
+
+PLOT = True               # 是否繪圖；批次回測設為 False 即不載入 matplotlib
+PLOT_PATH = None          # 圖檔輸出路徑，None 則直接顯示
+
 # ------------------------------
 # 下載資料函式
 # ------------------------------
@@ -45,32 +53,32 @@ def add_indicators(df):
     df['ma_long'] = df['price'].rolling(window=LONG_MA_WINDOW, min_periods=1).mean()
     
     # Calculate True Range (TR) needed for ADX
-    df['high'] = df['price']
-    df['low'] = df['price']
-    df['prev_close'] = df['price'].shift(1)
-    df['tr1'] = df['high'] - df['low']
-    df['tr2'] = abs(df['high'] - df['prev_close'])
-    df['tr3'] = abs(df['low'] - df['prev_close'])
-    df['TR'] = df[['tr1','tr2','tr3']].max(axis=1)
+    # 只有收盤價，high/low 即為收盤價，以區域變數計算而不新增欄位
+    price = df['price']
+    price = price.iloc[:, 0] if isinstance(price, pd.DataFrame) else price
+    high = low = price
+    prev_close = high.shift(1)
+    tr1 = high - low
+    tr2 = abs(high - prev_close)
+    tr3 = abs(low - prev_close)
+    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
     
     # 計算方向性指標 (Directional Movement)
-    df['up_move'] = df['high'] - df['high'].shift(1)
-    df['down_move'] = df['low'].shift(1) - df['low']
+    up_move = high - high.shift(1)
+    down_move = low.shift(1) - low
     
     # Initialize +DM 與 -DM
-    df['+DM'] = np.where((df['up_move'] > df['down_move']) & (df['up_move'] > 0), df['up_move'], 0)
-    df['-DM'] = np.where((df['down_move'] > df['up_move']) & (df['down_move'] > 0), df['down_move'], 0)
+    plus_dm = pd.Series(np.where((up_move > down_move) & (up_move > 0), up_move, 0), index=df.index)
+    minus_dm = pd.Series(np.where((down_move > up_move) & (down_move > 0), down_move, 0), index=df.index)
     
     # Smoothing TR, +DM, -DM using exponential moving average
-    df['ATR'] = df['TR'].ewm(alpha=1/ADX_WINDOW, min_periods=ADX_WINDOW).mean()
-    df['+DI'] = 100 * (df['+DM'].ewm(alpha=1/ADX_WINDOW, min_periods=ADX_WINDOW).mean() / df['ATR'])
-    df['-DI'] = 100 * (df['-DM'].ewm(alpha=1/ADX_WINDOW, min_periods=ADX_WINDOW).mean() / df['ATR'])
+    atr = tr.ewm(alpha=1/ADX_WINDOW, min_periods=ADX_WINDOW).mean()
+    plus_di = 100 * (plus_dm.ewm(alpha=1/ADX_WINDOW, min_periods=ADX_WINDOW).mean() / atr)
+    minus_di = 100 * (minus_dm.ewm(alpha=1/ADX_WINDOW, min_periods=ADX_WINDOW).mean() / atr)
     
-    df['DX'] = (abs(df['+DI'] - df['-DI']) / (df['+DI'] + df['-DI'])) * 100
-    df['ADX'] = df['DX'].rolling(window=ADX_WINDOW, min_periods=ADX_WINDOW).mean()
-    
-    # 清除多餘欄位
-    df.drop(['high','low','prev_close','tr1','tr2','tr3','TR','up_move','down_move','+DM','-DM','+DI','-DI','DX'], axis=1, inplace=True)
+    dx = (abs(plus_di - minus_di) / (plus_di + minus_di)) * 100
+    df['ATR'] = atr
+    df['ADX'] = dx.rolling(window=ADX_WINDOW, min_periods=ADX_WINDOW).mean()
     
     df = df.iloc[ADX_WINDOW*2:]
     return df
@@ -113,6 +121,8 @@ def backtest(df):
     Execution:
       - Enter long position when a buy signal is generated.
       - Exit position when a sell signal occurs or stop-loss is hit.
+    Bar-by-bar reference implementation of backtest_arrays(), which main()
+    uses; keep the two in sync.
     """
     df = df.copy()
     df['position'] = 0        # 持倉數量
@@ -161,67 +171,150 @@ def backtest(df):
 
     return df
 
+
+def backtest_arrays(price, signal):
+    """
+    Same rules as backtest() on plain arrays, returning (position, total).
+    Instead of stepping through every bar, jump from one trade to the next:
+    when flat, enter on the next buy signal; when long, exit on the first
+    later bar with a sell signal or a price below the stop-loss level.
+    """
+    price = np.asarray(price, dtype=np.float64).ravel()
+    signal = np.asarray(signal).ravel()
+    n = len(price)
+    trade = np.zeros(n)
+    buys = np.flatnonzero(signal == 1)
+    sells = np.flatnonzero(signal == -1)
+
+    i = 1  # 第一根 K 棒不交易
+    while True:
+        # 空手時，於下一個買進訊號進場
+        k = np.searchsorted(buys, i)
+        if k == len(buys):
+            break
+        entry = buys[k]
+        trade[entry] = TRADE_SIZE
+
+        # 持有時，出場於下一個賣出訊號或先觸及的停損
+        k = np.searchsorted(sells, entry + 1)
+        last = sells[k] if k < len(sells) else n - 1
+        stopped = np.flatnonzero(price[entry + 1:last + 1] < price[entry] * (1 - STOP_LOSS_RATE))
+        if len(stopped):
+            last = entry + 1 + stopped[0]
+        elif k == len(sells):
+            break
+        trade[last] = -TRADE_SIZE
+        # 出場當根不會再進場
+        i = last + 1
+
+    position = np.cumsum(trade)
+    cash = INITIAL_CAPITAL - np.cumsum(trade * price)
+    return position, cash + position * price
+
+# ------------------------------
+# 多時間框架
+# ------------------------------
+def resample_bars(days, price, frequency):
+    """
+    Last close of every week ('W-FRI') or month ('M') of daily bars given as
+    int32 days since 1970-01-01; 'D' returns the bars unchanged. Each bar is
+    labeled by its last trading day. The current week or month is left out
+    until it is complete, so no signal is taken on a bar that can still change.
+    """
+    last, _ = period_ends(days, frequency, complete_only=True)
+    return days[last], price[last]
+
+
+def run_timeframes(df, timeframes=TIMEFRAMES):
+    """
+    Indicators, signals and array backtest for every timeframe from one daily
+    download. Returns {timeframe: DataFrame} with the columns of
+    generate_signals() plus position and total. Timeframes with too few bars
+    to leave two bars after the indicator warm-up are left out.
+    """
+    days = df.index.values.astype('datetime64[D]').astype(np.int32)
+    price = np.asarray(df['price'], dtype=np.float64).ravel()
+
+    results = {}
+    for timeframe in timeframes:
+        bar_days, bar_price = resample_bars(days, price, timeframe)
+        if len(bar_days) < 2 * ADX_WINDOW + 2:
+            continue
+        bars = pd.DataFrame({'price': bar_price}, index=pd.DatetimeIndex(bar_days.astype('datetime64[D]')))
+        bars = generate_signals(add_indicators(bars))
+        bars['position'], bars['total'] = backtest_arrays(bars['price'], bars['signal'])
+        results[timeframe] = bars
+    return results
+
+# ------------------------------
+# 績效指標
+# ------------------------------
+def print_metrics(df, periods_per_year=PERIODS_PER_YEAR['D']):
+    """
+    Print CAGR, volatility, Sharpe/Sortino, max drawdown, turnover and trade
+    statistics of a backtest result.
+    """
+    m = summary(np.asarray(df['total'], dtype=float).ravel(),
+                np.asarray(df['position']).ravel(),
+                np.asarray(df['price'], dtype=float).ravel(),
+                periods_per_year=periods_per_year)
+    print(format_summary(m))
+
 # ------------------------------
 # 繪圖函式
 # ------------------------------
-def plot_results(df):
+def plot_results(df, path=None):
     """
     Plot price, moving averages, and portfolio value.
+    Lines are downsampled; with a path the chart is saved instead of shown.
     """
-    plt.figure(figsize=(14, 10))
-    
-    # 價格與均線圖
-    ax1 = plt.subplot(2, 1, 1)
-    plt.plot(df.index, df['price'], label='Price', color='black')
-    plt.plot(df.index, df['ma_short'], label=f'MA ({SHORT_MA_WINDOW})', color='blue')
-    plt.plot(df.index, df['ma_long'], label=f'MA ({LONG_MA_WINDOW})', color='red')
-    
-    # 標註買進與賣出訊號
-    buys = df[df['signal'] == 1]
-    sells = df[df['signal'] == -1]
-    plt.scatter(buys.index, buys['price'], marker='^', color='green', label='Buy Signal', s=100)
-    plt.scatter(sells.index, sells['price'], marker='v', color='magenta', label='Sell Signal', s=100)
-    
-    plt.title(f"{SYMBOL} Price with Trend-Following Signals")
-    plt.xlabel("Date")
-    plt.ylabel("Price")
-    plt.legend()
-    plt.grid()
-
-    # 投資組合總價值圖
-    ax2 = plt.subplot(2, 1, 2, sharex=ax1)
-    plt.plot(df.index, df['total'], label='Total Portfolio Value', color='purple')
-    plt.title("Portfolio Value Over Time")
-    plt.xlabel("Date")
-    plt.ylabel("Total Value")
-    plt.legend()
-    plt.grid()
-    
-    plt.tight_layout()
-    plt.show()
+    panels = [
+        # 價格與均線圖，標註買進與賣出訊號
+        {
+            'title': f"{SYMBOL} Price with Trend-Following Signals",
+            'ylabel': "Price",
+            'lines': [
+                ('Price', df['price'], {'color': 'black'}),
+                (f'MA ({SHORT_MA_WINDOW})', df['ma_short'], {'color': 'blue'}),
+                (f'MA ({LONG_MA_WINDOW})', df['ma_long'], {'color': 'red'}),
+            ],
+            'markers': [
+                ('Buy Signal', df['signal'] == 1, df['price'], {'marker': '^', 'color': 'green', 's': 100}),
+                ('Sell Signal', df['signal'] == -1, df['price'], {'marker': 'v', 'color': 'magenta', 's': 100}),
+            ],
+        },
+        # 投資組合總價值圖
+        {
+            'title': "Portfolio Value Over Time",
+            'ylabel': "Total Value",
+            'lines': [('Total Portfolio Value', df['total'], {'color': 'purple'})],
+        },
+    ]
+    plotting.render(df.index, panels, path)
 
 # ------------------------------
 # 主流程
 # ------------------------------
-def main():
+def main(plot=PLOT, plot_path=PLOT_PATH):
     # 1. 下載資料
     df = download_data(SYMBOL, START_DATE, END_DATE)
     
-    # 2. 加入技術指標 (移動平均與 ADX)
-    df = add_indicators(df)
-    
-    # 3. 產生交易訊號 (利用均線交叉與趨勢確認)
-    df = generate_signals(df)
-    
-    # 4. 執行回測 (包含停損)
-    df_bt = backtest(df)
+    # 2-4. 各時間框架：加入技術指標、產生交易訊號、執行回測 (包含停損)
+    results = run_timeframes(df)
     
-    # 5. 輸出最終投資組合價值
-    final_value = df_bt['total'].iloc[-1]
-    print(f"Final portfolio value: {final_value:.2f}")
+    # 5. 輸出各時間框架的最終投資組合價值與績效
+    for timeframe in TIMEFRAMES:
+        if timeframe not in results:
+            print(f"[{timeframe}] not enough bars")
+            continue
+        df_bt = results[timeframe]
+        final_value = df_bt['total'].iloc[-1]
+        print(f"[{timeframe}] Final portfolio value: {final_value:.2f}")
+        print_metrics(df_bt, PERIODS_PER_YEAR[timeframe])
     
-    # 6. 畫圖展示結果
-    plot_results(df_bt)
+    # 6. 畫圖展示結果 (日線)
+    if plot and 'D' in results:
+        plot_results(results['D'], plot_path)
 
 if __name__ == "__main__":
     main()
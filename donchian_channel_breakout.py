@@ -1,7 +1,8 @@
 import pandas as pd
 import numpy as np
 import yfinance as yf
-import matplotlib.pyplot as plt
+from portfolio_metrics import summary, format_summary
+import plotting
 
 # ------------------------------
 # Parameters Setting
@@ -17,6 +18,9 @@ TAKE_PROFIT_RATE = 0.15 # 15% take profit for long positions
 INITIAL_CAPITAL = 100000   # Initial capital
 TRADE_SIZE = 1         # Number of shares per trade
 
+PLOT = True            # set to False for headless batch runs (matplotlib is never imported)
+PLOT_PATH = None       # save the chart to this file instead of showing it
+
 # ------------------------------
 # Download Data Function
 # ------------------------------
@@ -131,48 +135,55 @@ def backtest(df):
 
     return df
 
+# ------------------------------
+# Performance Metrics
+# ------------------------------
+def print_metrics(df):
+    """
+    Print CAGR, volatility, Sharpe/Sortino, max drawdown, turnover and trade
+    statistics of a backtest result.
+    """
+    m = summary(np.asarray(df['total'], dtype=float).ravel(),
+                np.asarray(df['position']).ravel(),
+                np.asarray(df['price'], dtype=float).ravel())
+    print(format_summary(m))
+
 # ------------------------------
 # Plotting Function
 # ------------------------------
-def plot_results(df):
+def plot_results(df, path=None):
     """
     Plot the price chart with Donchian Channel and trading signals,
     along with the portfolio total value over time.
+    Lines are downsampled; with a path the chart is saved instead of shown.
     """
-    plt.figure(figsize=(14, 10))
-    
-    # Price chart and indicators plot
-    ax1 = plt.subplot(2, 1, 1)
-    plt.plot(df.index, df['price'], label='Price', color='black')
-    plt.plot(df.index, df['donchian_high'], label=f'Donchian High ({DONCHIAN_WINDOW})', color='blue', linestyle='--')
-    plt.plot(df.index, df['donchian_low'], label=f'Donchian Low ({DONCHIAN_WINDOW})', color='red', linestyle='--')
-    
-    # Mark buy signals on the chart
-    buys = df[df['signal'] == 1]
-    plt.scatter(buys.index, buys['price'], marker='^', color='green', label='Buy Signal', s=100)
-    
-    plt.title(f"{SYMBOL} Price with Donchian Breakout Signals")
-    plt.xlabel("Date")
-    plt.ylabel("Price")
-    plt.legend()
-    plt.grid()
-
-    # Portfolio value plot
-    ax2 = plt.subplot(2, 1, 2, sharex=ax1)
-    plt.plot(df.index, df['total'], label='Total Portfolio Value', color='purple')
-    plt.title("Portfolio Value Over Time")
-    plt.xlabel("Date")
-    plt.ylabel("Total Value")
-    plt.legend()
-    plt.grid()
-    
-    plt.tight_layout()
-    plt.show()
+    panels = [
+        # Price chart and indicators plot, with buy signals marked
+        {
+            'title': f"{SYMBOL} Price with Donchian Breakout Signals",
+            'ylabel': "Price",
+            'lines': [
+                ('Price', df['price'], {'color': 'black'}),
+                (f'Donchian High ({DONCHIAN_WINDOW})', df['donchian_high'], {'color': 'blue', 'linestyle': '--'}),
+                (f'Donchian Low ({DONCHIAN_WINDOW})', df['donchian_low'], {'color': 'red', 'linestyle': '--'}),
+            ],
+            'markers': [
+                ('Buy Signal', df['signal'] == 1, df['price'], {'marker': '^', 'color': 'green', 's': 100}),
+            ],
+        },
+        # Portfolio value plot
+        {
+            'title': "Portfolio Value Over Time",
+            'ylabel': "Total Value",
+            'lines': [('Total Portfolio Value', df['total'], {'color': 'purple'})],
+        },
+    ]
+    plotting.render(df.index, panels, path)
 
 # ------------------------------
 # Main Execution Flow
 # ------------------------------
-def main():
+def main(plot=PLOT, plot_path=PLOT_PATH):
     # 1. Download historical data
     df = download_data(SYMBOL, START_DATE, END_DATE)
 
@@ -188,9 +199,11 @@ def main():
     # 5. Output final portfolio value
     final_value = df_bt['total'].iloc[-1]
     print(f"Final portfolio value: {final_value:.2f}")
+    print_metrics(df_bt)
 
     # 6. Plot the results
-    plot_results(df_bt)
+    if plot:
+        plot_results(df_bt, plot_path)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,213 @@
+#!/usr/local/bin/python3
+
+from collections import namedtuple
+import sys
+import time
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from portfolio_metrics import summary
+
+# ------------------------------
+# Parameters Setting
+# ------------------------------
+SYMBOLS = ['SPY', 'TLT']
+START_DATE = "2002-07-30"
+END_DATE = "2025-01-01"
+
+NUM_TRADING_DAYS_PER_YEAR = 252
+WINDOW_SIZE = 20          # trailing trading days used to estimate volatility
+REBALANCE_EVERY = 20      # trading days between scheduled rebalances, 0 disables the schedule
+DRIFT_BAND = 0.05         # absolute weight drift from target that forces a rebalance, 0 disables
+COST_RATE = 0.001         # transaction cost per unit of traded value (10 bps)
+LOSS_ONLY = False         # estimate volatility from losing days only
+CONSIDER_DIVIDENDS = False
+INITIAL_CAPITAL = 100000
+
+BacktestResult = namedtuple('BacktestResult', ['equity', 'weights', 'turnover', 'costs', 'rebalance_days'])
+
+# ------------------------------
+# Download Data Function
+# ------------------------------
+def download_prices(symbols, start, end, consider_dividends=CONSIDER_DIVIDENDS):
+    """
+    Download aligned daily prices for all symbols as a (T x N) DataFrame.
+    Uses Adj Close when dividends are considered, Close otherwise.
+    """
+    data = yf.download(tickers=symbols, start=start, end=end, auto_adjust=False)
+    column = 'Adj Close' if consider_dividends else 'Close'
+    return data[column][symbols].dropna()
+
+# ------------------------------
+# Inverse Volatility Weights
+# ------------------------------
+def rolling_volatility(prices, window_size=WINDOW_SIZE, loss_only=LOSS_ONLY):
+    """
+    Annualized volatility of the trailing `window_size` daily returns for every
+    day and symbol, computed from cumulative sums in a single O(T x N) pass.
+    Row t only uses prices up to and including day t; rows without a full
+    window are NaN. float32 prices are not upcast; the sums are accumulated
+    in float64.
+    """
+    prices = np.asarray(prices)
+    returns = prices[1:] / prices[:-1] - 1
+    if loss_only:
+        mask = returns <= 0
+        returns = np.where(mask, returns, 0)
+    else:
+        mask = np.ones(returns.shape, dtype=bool)
+
+    def window_sum(x):
+        c = np.zeros((x.shape[0] + 1,) + x.shape[1:])
+        np.cumsum(x, axis=0, dtype=np.float64, out=c[1:])
+        return c[window_size:] - c[:-window_size]
+
+    n = window_sum(mask)
+    s1 = window_sum(returns)
+    s2 = window_sum(returns * returns)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var = (s2 - s1 * s1 / n) / (n - 1)
+    var = np.where(n > 1, np.maximum(var, 0.0), np.nan)
+
+    volatility = np.full(prices.shape, np.nan)
+    volatility[window_size:] = np.sqrt(var * NUM_TRADING_DAYS_PER_YEAR)
+    return volatility
+
+
+def inverse_volatility_weights(volatility):
+    """
+    Normalize 1 / volatility along the last axis. Works on a single vector, a
+    (T x N) history or any batch of them.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inverse = 1.0 / np.asarray(volatility)
+        return inverse / inverse.sum(axis=-1, keepdims=True)
+
+# ------------------------------
+# Walk-forward Simulation
+# ------------------------------
+def simulate(prices, target_weights, rebalance_every=REBALANCE_EVERY, drift_band=DRIFT_BAND,
+             cost_rate=COST_RATE, initial_capital=INITIAL_CAPITAL):
+    """
+    Simulate a portfolio that trades to `target_weights` at the close of each
+    rebalance day and holds constant units in between.
+
+    A rebalance happens on the first day with valid target weights, every
+    `rebalance_every` trading days afterwards, and on any day where a held
+    weight drifts more than `drift_band` away from that day's target. Costs
+    are `cost_rate` times the traded value and are taken out of equity.
+
+    Between rebalances the equity curve is evaluated for the whole segment at
+    once, so the Python loop only runs once per rebalance.
+    """
+    prices = np.asarray(prices)
+    target_weights = np.asarray(target_weights, dtype=np.float64)
+    num_days, num_assets = prices.shape
+    if rebalance_every <= 0 and drift_band <= 0:
+        raise ValueError("either rebalance_every or drift_band must be positive")
+
+    equity = np.full(num_days, np.nan)
+    weights = np.full((num_days, num_assets), np.nan)
+    turnover = np.zeros(num_days)
+    costs = np.zeros(num_days)
+    rebalance_days = []
+
+    valid = np.flatnonzero(np.isfinite(target_weights).all(axis=1))
+    if valid.size == 0:
+        return BacktestResult(equity, weights, turnover, costs, np.array(rebalance_days, dtype=np.int64))
+
+    t = valid[0]
+    value = float(initial_capital)
+    units = np.zeros(num_assets)
+    current = np.zeros(num_assets)
+    while True:
+        if units.any():
+            holdings = units * prices[t]
+            value = holdings.sum()
+            current = holdings / value
+        target = target_weights[t]
+        if not np.isfinite(target).all():
+            target = current
+        traded = np.abs(target - current).sum()
+        cost = cost_rate * traded * value
+        value -= cost
+        units = target * value / prices[t]
+
+        equity[t] = value
+        weights[t] = target
+        turnover[t] = traded
+        costs[t] = cost
+        rebalance_days.append(t)
+
+        # Walk forward segment by segment until the next rebalance day.
+        next_t = None
+        start = t + 1
+        while start < num_days:
+            if rebalance_every > 0:
+                stop = min(num_days, t + rebalance_every + 1)
+            else:
+                stop = min(num_days, start + NUM_TRADING_DAYS_PER_YEAR)
+            holdings = prices[start:stop] * units
+            segment_equity = holdings.sum(axis=1)
+            segment_weights = holdings / segment_equity[:, None]
+            equity[start:stop] = segment_equity
+            weights[start:stop] = segment_weights
+
+            if drift_band > 0:
+                drift = np.abs(segment_weights - target_weights[start:stop])
+                breach = np.flatnonzero((drift > drift_band).any(axis=1))
+                if breach.size:
+                    next_t = start + breach[0]
+                    break
+            if rebalance_every > 0:
+                if stop - 1 == t + rebalance_every:
+                    next_t = stop - 1
+                break
+            start = stop
+
+        if next_t is None:
+            break
+        t = next_t
+
+    return BacktestResult(equity, weights, turnover, costs, np.array(rebalance_days, dtype=np.int64))
+
+
+def backtest(prices, window_size=WINDOW_SIZE, loss_only=LOSS_ONLY, rebalance_every=REBALANCE_EVERY,
+             drift_band=DRIFT_BAND, cost_rate=COST_RATE, initial_capital=INITIAL_CAPITAL):
+    """
+    Walk-forward inverse volatility backtest over a (T x N) price matrix.
+    Weights on each rebalance day only use the trailing window ending that day.
+    """
+    volatility = rolling_volatility(prices, window_size, loss_only)
+    target_weights = inverse_volatility_weights(volatility)
+    return simulate(prices, target_weights, rebalance_every, drift_band, cost_rate, initial_capital)
+
+# ------------------------------
+# Main Execution Flow
+# ------------------------------
+def main():
+    symbols = SYMBOLS
+    if len(sys.argv) > 1:
+        symbols = [s.strip().upper() for s in sys.argv[1].split(',')]
+
+    prices = download_prices(symbols, START_DATE, END_DATE)
+
+    begin = time.perf_counter()
+    result = backtest(prices.values)
+    elapsed = time.perf_counter() - begin
+
+    equity = pd.Series(result.equity, index=prices.index).dropna()
+    metrics = summary(equity.values)
+
+    print("Portfolio: {}, from {} to {} (window size is {} days)".format(
+        str(symbols), equity.index[0].strftime('%Y-%m-%d'), equity.index[-1].strftime('%Y-%m-%d'), WINDOW_SIZE))
+    print(f"Final portfolio value: {equity.iloc[-1]:.2f}, CAGR: {metrics['cagr'] * 100:.2f}%, "
+          f"Sharpe: {metrics['sharpe_ratio']:.2f}, max drawdown: {metrics['max_drawdown'] * 100:.2f}%")
+    print(f"Rebalances: {len(result.rebalance_days)}, total costs: {result.costs.sum():.2f}, "
+          f"average turnover: {result.turnover[result.rebalance_days].mean() * 100:.2f}%")
+    for i in range(len(symbols)):
+        print(f"{symbols[i]} latest allocation ratio: {result.weights[-1, i] * 100:.2f}%")
+    print(f"Simulated in {elapsed * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
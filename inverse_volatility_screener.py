@@ -0,0 +1,121 @@
+#!/usr/local/bin/python3
+
+import sys
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from inverse_volatility_backtest import inverse_volatility_weights, NUM_TRADING_DAYS_PER_YEAR
+from price_matrix import PriceMatrix
+
+# ------------------------------
+# Parameters Setting
+# ------------------------------
+UNIVERSE_FILE = 'universe.txt'   # one symbol per line (or comma separated), '#' starts a comment
+TOP_K = 10
+SCORE = 'return_to_volatility'   # see SCORES below
+START_DATE = "2024-01-01"
+END_DATE = "2025-01-01"
+WINDOW_SIZE = 0                  # trading days at the end of the range, 0 uses the whole range
+LOSS_ONLY = False                # weight the basket by downside volatility
+CONSIDER_DIVIDENDS = False
+DOWNLOAD_BATCH = 500             # symbols per yfinance request
+
+# Score of every symbol from the statistics of screen(); higher is better
+SCORES = {
+    'inverse_volatility': lambda s: 1 / s['volatility'],
+    'inverse_downside_volatility': lambda s: 1 / s['downside_volatility'],
+    'performance': lambda s: s['performance'],
+    'return_to_volatility': lambda s: s['performance'] / s['volatility'],
+    'return_to_downside_volatility': lambda s: s['performance'] / s['downside_volatility'],
+}
+
+# ------------------------------
+# Universe Loading
+# ------------------------------
+def read_universe(path):
+    symbols = []
+    with open(path) as file:
+        for line in file:
+            line = line.split('#')[0]
+            symbols.extend(s.strip().upper() for s in line.split(',') if s.strip())
+    return list(dict.fromkeys(symbols))
+
+
+def download_universe(symbols, start, end, consider_dividends=CONSIDER_DIVIDENDS):
+    """
+    Download every symbol in batches and align them into one PriceMatrix.
+    """
+    column = 'Adj Close' if consider_dividends else 'Close'
+    frames = []
+    for i in range(0, len(symbols), DOWNLOAD_BATCH):
+        batch = symbols[i:i + DOWNLOAD_BATCH]
+        data = yf.download(tickers=batch, start=start, end=end, auto_adjust=False, group_by='column')
+        frames.append(data[column])
+    prices = pd.concat(frames, axis=1)
+    return PriceMatrix.from_frame(prices.dropna(how='all'))
+
+# ------------------------------
+# Screening
+# ------------------------------
+def screen(prices, window_size=WINDOW_SIZE):
+    """
+    Annualized volatility, downside (losing days only) volatility and
+    performance of every symbol over the last `window_size` days of a (T x N)
+    price matrix, in one vectorized pass. Symbols with missing prices in the
+    window get NaN.
+    """
+    prices = np.asarray(prices)
+    if window_size:
+        prices = prices[-(window_size + 1):]
+    returns = prices[1:] / prices[:-1] - 1
+    losses = np.where(returns <= 0, returns, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        downside = np.nanstd(losses, axis=0, ddof=1)
+    downside[np.isnan(returns).any(axis=0)] = np.nan
+    return {
+        'volatility': np.std(returns, axis=0, ddof=1) * np.sqrt(NUM_TRADING_DAYS_PER_YEAR),
+        'downside_volatility': downside * np.sqrt(NUM_TRADING_DAYS_PER_YEAR),
+        'performance': prices[-1] / prices[0] - 1.0,
+    }
+
+
+def top_k(scores, k):
+    """
+    Indices of the k highest finite scores, best first. Uses a partial sort so
+    only the selected k are fully ordered.
+    """
+    scores = np.where(np.isfinite(scores), scores, -np.inf)
+    k = min(k, np.isfinite(scores).sum())
+    if k == 0:
+        return np.array([], dtype=np.int64)
+    chosen = np.argpartition(-scores, k - 1)[:k]
+    return chosen[np.argsort(-scores[chosen], kind='stable')]
+
+# ------------------------------
+# Main Execution Flow
+# ------------------------------
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else UNIVERSE_FILE
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else TOP_K
+
+    universe = read_universe(path)
+    matrix = download_universe(universe, START_DATE, END_DATE)
+    statistics = screen(matrix.values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = SCORES[SCORE](statistics)
+    chosen = top_k(scores, k)
+
+    volatility = statistics['downside_volatility' if LOSS_ONLY else 'volatility'][chosen]
+    weights = inverse_volatility_weights(volatility)
+
+    dates = matrix.dates
+    start = dates[-(WINDOW_SIZE + 1)] if WINDOW_SIZE else dates[0]
+    print("Screened {} of {} symbols by {}, as of {} (window size is {} days) from {}".format(
+        np.isfinite(scores).sum(), len(universe), SCORE, dates[-1], WINDOW_SIZE, start))
+    for i, j in enumerate(chosen):
+        print('{} allocation ratio: {:.2f}% (score: {:.4f}, anualized volatility: {:.2f}%, downside volatility: {:.2f}%, performance: {:.2f}%)'.format(
+            matrix.symbols[j], weights[i] * 100, scores[j], statistics['volatility'][j] * 100,
+            statistics['downside_volatility'][j] * 100, statistics['performance'][j] * 100))
+
+if __name__ == "__main__":
+    main()
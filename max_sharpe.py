@@ -0,0 +1,207 @@
+import numpy as np
+
+# ------------------------------
+# Parameters Setting
+# ------------------------------
+NUM_TRADING_DAYS_PER_YEAR = 252
+MAX_ENUMERATION_ASSETS = 8    # up to this many assets binding cases are solved by enumerating supports
+TOLERANCE = 1e-12
+
+# ------------------------------
+# Batched Estimators
+# ------------------------------
+def mean_historical_return(prices, returns_data=False, compounding=True, frequency=NUM_TRADING_DAYS_PER_YEAR):
+    """
+    Annualized mean historical return, matching
+    `pypfopt.expected_returns.mean_historical_return`, for a (..., T x N) stack
+    of price (or return) windows. Returns (..., N).
+    """
+    data = np.asarray(prices, dtype=np.float64)
+    returns = data if returns_data else data[..., 1:, :] / data[..., :-1, :] - 1.0
+    if compounding:
+        return np.prod(1.0 + returns, axis=-2) ** (frequency / returns.shape[-2]) - 1.0
+    return returns.mean(axis=-2) * frequency
+
+
+def sample_cov(prices, returns_data=False, frequency=NUM_TRADING_DAYS_PER_YEAR):
+    """
+    Annualized sample covariance, matching `pypfopt.risk_models.sample_cov`,
+    for a (..., T x N) stack of price (or return) windows. Returns (..., N x N).
+    """
+    data = np.asarray(prices, dtype=np.float64)
+    returns = data if returns_data else data[..., 1:, :] / data[..., :-1, :] - 1.0
+    centered = returns - returns.mean(axis=-2, keepdims=True)
+    return frequency * np.einsum('...ti,...tj->...ij', centered, centered) / (returns.shape[-2] - 1)
+
+
+def rolling_mean_historical_return_and_cov(prices, window_size, start=0, stop=None,
+                                           frequency=NUM_TRADING_DAYS_PER_YEAR):
+    """
+    `mean_historical_return` and `sample_cov` of every window
+    prices[i:i + window_size] for i in [start, stop), without materializing the
+    windows. Returns (K x N) and (K x N x N) arrays, K = stop - start.
+
+    Window sums are updated by adding the return entering and removing the one
+    leaving each window, so the cost is O((K + window_size) x N^2) instead of
+    O(K x window_size x N^2).
+
+    Missing (NaN) prices do not poison later windows, but the statistics of a
+    window with a missing price for a symbol are meaningless for that symbol;
+    callers have to mask those windows.
+    """
+    if stop is None:
+        stop = prices.shape[0] - window_size + 1
+    num_windows = stop - start
+    n = window_size - 1
+    block = np.asarray(prices[start:stop + n], dtype=np.float64)
+    returns = block[1:] / block[:-1] - 1.0
+    # Covariance is shift invariant; centering keeps the running sums small.
+    # Missing returns are zeroed so they drop out of the sums.
+    finite = np.isfinite(returns)
+    returns = np.where(finite, returns, 0.0)
+    returns = np.where(finite, returns - returns.sum(axis=0) / np.maximum(finite.sum(axis=0), 1), 0.0)
+
+    s1 = np.zeros((returns.shape[0] + 1, returns.shape[1]))
+    np.cumsum(returns, axis=0, out=s1[1:])
+    s1 = s1[n:n + num_windows] - s1[:num_windows]
+
+    s2 = np.empty((num_windows,) + (returns.shape[1],) * 2)
+    s2[0] = returns[:n].T @ returns[:n]
+    entering = returns[n:n + num_windows - 1]
+    leaving = returns[:num_windows - 1]
+    np.cumsum(entering[:, :, None] * entering[:, None, :] - leaving[:, :, None] * leaving[:, None, :],
+              axis=0, out=s2[1:])
+    s2[1:] += s2[0]
+
+    cov = frequency * (s2 - s1[:, :, None] * s1[:, None, :] / n) / (n - 1)
+    mu = (block[n:n + num_windows] / block[:num_windows]) ** (frequency / n) - 1.0
+    return mu, cov
+
+# ------------------------------
+# Tangency Solver
+# ------------------------------
+def _solve(a, b):
+    try:
+        return np.linalg.solve(a, b[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        return np.einsum('...ij,...j->...i', np.linalg.pinv(a), b)
+
+
+def _enumerate_supports(excess, cov):
+    """
+    Exact long-only tangency for small N: on every support S the interior
+    optimum is proportional to inv(cov_SS) @ excess_S, and its squared Sharpe
+    ratio is excess_S' inv(cov_SS) excess_S. The optimum is the feasible
+    support with the highest Sharpe ratio.
+    """
+    num_problems, num_assets = excess.shape
+    best_sharpe = np.full(num_problems, -np.inf)
+    best = np.full((num_problems, num_assets), np.nan)
+    masks = (np.arange(1, 2 ** num_assets)[:, None] >> np.arange(num_assets)) & 1
+
+    for size in range(1, num_assets + 1):
+        for mask in masks[masks.sum(axis=1) == size]:
+            support = np.flatnonzero(mask)
+            e = excess[:, support]
+            y = _solve(cov[:, support[:, None], support], e)
+            sharpe = np.einsum('ki,ki->k', e, y)
+            feasible = (y >= 0).all(axis=1) & (sharpe > best_sharpe) & (y.sum(axis=1) > 0)
+            if feasible.any():
+                best_sharpe[feasible] = sharpe[feasible]
+                best[feasible] = 0.0
+                best[np.ix_(feasible, support)] = y[feasible] / y[feasible].sum(axis=1, keepdims=True)
+    return best
+
+
+def _active_set(excess, cov, tolerance=TOLERANCE):
+    """
+    Primal active-set method for one problem in the equivalent form
+        min y' cov y  s.t.  excess' y = 1, y >= 0,  weights = y / sum(y)
+    """
+    num_assets = excess.shape[0]
+    k = np.argmax(excess)
+    if excess[k] <= 0:
+        return np.full(num_assets, np.nan)
+
+    y = np.zeros(num_assets)
+    y[k] = 1.0 / excess[k]
+    free = np.zeros(num_assets, dtype=bool)
+    free[k] = True
+    for _ in range(10 * num_assets):
+        index = np.flatnonzero(free)
+        z = _solve(cov[np.ix_(index, index)], excess[index])
+        scale = excess[index] @ z
+        target = z / scale
+        if (target >= -tolerance).all():
+            y[:] = 0.0
+            y[index] = np.maximum(target, 0.0)
+            multipliers = cov @ y - excess / scale
+            multipliers[free] = np.inf
+            j = np.argmin(multipliers)
+            if multipliers[j] >= -tolerance:
+                break
+            free[j] = True
+        else:
+            direction = target - y[index]
+            with np.errstate(divide='ignore'):
+                ratios = np.where(direction < 0, y[index] / -direction, np.inf)
+            i = np.argmin(ratios)
+            y[index] += ratios[i] * direction
+            y[index[i]] = 0.0
+            free[index[i]] = False
+    return y / y.sum()
+
+
+def max_sharpe_weights(mu, cov, risk_free_rate=0.0):
+    """
+    Long-only maximum Sharpe ratio weights for a stack of problems: `mu` is
+    (K x N) and `cov` is (K x N x N); a single (N,) / (N x N) problem is also
+    accepted. Equivalent to `EfficientFrontier(mu, cov).max_sharpe()` with the
+    default (0, 1) weight bounds.
+
+    Every problem is first solved in closed form, weights proportional to
+    inv(cov) @ (mu - risk_free_rate). Problems where that puts a negative
+    weight on some asset are re-solved with the long-only constraint binding.
+    Rows where no asset beats the risk-free rate are NaN.
+    """
+    mu = np.asarray(mu, dtype=np.float64)
+    cov = np.asarray(cov, dtype=np.float64)
+    single = mu.ndim == 1
+    mu = np.atleast_2d(mu)
+    cov = cov.reshape((-1,) + cov.shape[-2:])
+    excess = mu - risk_free_rate
+
+    y = _solve(cov, excess)
+    total = y.sum(axis=1)
+    interior = (y >= 0).all(axis=1) & (total > 0)
+    weights = np.full(excess.shape, np.nan)
+    weights[interior] = y[interior] / total[interior, None]
+
+    binding = np.flatnonzero(~interior & (excess > 0).any(axis=1))
+    if binding.size:
+        if excess.shape[1] <= MAX_ENUMERATION_ASSETS:
+            weights[binding] = _enumerate_supports(excess[binding], cov[binding])
+        else:
+            for k in binding:
+                weights[k] = _active_set(excess[k], cov[k])
+
+    return weights[0] if single else weights
+
+
+def portfolio_performance(weights, mu, cov, risk_free_rate=0.0):
+    """
+    Expected annual return, annual volatility and Sharpe ratio of each row of
+    weights, like `EfficientFrontier.portfolio_performance`.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    expected_return = np.einsum('...i,...i->...', weights, mu)
+    volatility = np.sqrt(np.einsum('...i,...ij,...j->...', weights, cov, weights))
+    return expected_return, volatility, (expected_return - risk_free_rate) / volatility
+
+
+def clean_weights(weights, cutoff=1e-4, rounding=5):
+    """
+    Zero out tiny weights and round, like `EfficientFrontier.clean_weights`.
+    """
+    weights = np.where(np.abs(weights) < cutoff, 0.0, weights)
+    return np.round(weights, rounding)
@@ -0,0 +1,132 @@
+#!/usr/local/bin/python3
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import combinations
+import sys
+import numpy as np
+import pandas as pd
+from checkpoint import run_chunked, iter_chunks, fingerprint
+from inverse_volatility_screener import read_universe, download_universe
+from max_sharpe import max_sharpe_weights, clean_weights, portfolio_performance, rolling_mean_historical_return_and_cov
+
+# ------------------------------
+# Parameters Setting
+# ------------------------------
+UNIVERSE_FILE = 'universe.txt'   # used when no comma separated symbols are given on the command line
+SUBSET_SIZE = 2                  # 2 scans every pair, 3 every triple, ...
+START_DATE = "2000-12-09"
+CONSIDER_DIVIDENDS = True
+WINDOW_SIZE = 240*10
+CHUNK_SIZE = 250                 # window start positions per task / checkpoint file
+SUBSET_BATCH = 5000              # subsets solved together, bounds the memory of one task
+PROCESSES = None                 # worker processes, None uses every core
+TOP = 20                         # subsets printed in the summary
+
+# ------------------------------
+# Scan
+# ------------------------------
+# This is IOO_BLK.py for every k-subset of a universe. A subset's rolling mean
+# and covariance are just entries of the universe's, so each task computes the
+# universe statistics once for its range of windows and gathers the (K x k)
+# and (K x k x k) blocks of all subsets from them; every subset of a task is
+# then solved in one batched max_sharpe_weights call. Tasks are window ranges,
+# not subsets, so no statistic is computed twice.
+
+_job = {}
+
+
+def _init_worker(prices, dates, symbols, subsets, window_size):
+    # Shipped once per worker process instead of once per task
+    _job.update(prices=prices, dates=dates, symbols=symbols, subsets=subsets, window_size=window_size)
+
+
+def scan(start, stop):
+    """
+    Max Sharpe weights and Sharpe ratio of every subset for the windows
+    starting in [start, stop), as a long frame with one row per (date, subset).
+    A row is skipped when a member has a missing price in the window, when
+    every member ended below where it started, or when there is no solution.
+    """
+    prices, subsets, window_size = _job['prices'], _job['subsets'], _job['window_size']
+    mu, S = rolling_mean_historical_return_and_cov(prices, window_size, start, stop)
+
+    finite = np.zeros((stop - start + window_size, prices.shape[1]), dtype=np.int32)
+    np.cumsum(np.isfinite(prices[start:stop + window_size - 1]), axis=0, out=finite[1:])
+    complete = finite[window_size:] - finite[:-window_size] == window_size
+    with np.errstate(invalid='ignore'):
+        fell = prices[start:stop] > prices[start + window_size - 1:stop + window_size - 1]
+
+    names = np.array([','.join(_job['symbols'][i] for i in subset) for subset in subsets])
+    dates = _job['dates'][start:stop]
+    frames = []
+    for i in range(0, len(subsets), SUBSET_BATCH):
+        idx = subsets[i:i + SUBSET_BATCH]
+        shape = (len(dates) * len(idx), idx.shape[1])
+        sub_mu = mu[:, idx].reshape(shape)
+        sub_S = S[:, idx[:, :, None], idx[:, None, :]].reshape(shape + shape[-1:])
+        keep = (complete[:, idx].all(axis=2) & ~fell[:, idx].all(axis=2)).ravel()
+
+        weights = np.full(shape, np.nan)
+        weights[keep] = clean_weights(max_sharpe_weights(sub_mu[keep], sub_S[keep]))
+        sharpe = portfolio_performance(weights, sub_mu, sub_S)[2]
+        keep &= ~np.isnan(sharpe)
+
+        frame = pd.DataFrame(weights[keep], columns=[f'weight_{j}' for j in range(shape[1])])
+        frame.insert(0, 'subset', np.tile(names[i:i + SUBSET_BATCH], len(dates))[keep])
+        frame.insert(0, 'date', np.repeat(dates, len(idx))[keep])
+        frame['sharpe'] = sharpe[keep]
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize(directory):
+    """
+    Per subset: number of windows, mean weights and mean / min Sharpe ratio,
+    aggregated one checkpoint file at a time.
+    """
+    parts = []
+    for chunk in iter_chunks(directory):
+        grouped = chunk.groupby('subset')
+        sums = grouped.sum(numeric_only=True)
+        sums['windows'] = grouped.size()
+        sums['min_sharpe'] = grouped['sharpe'].min()
+        parts.append(sums)
+    total = pd.concat(parts).groupby(level=0).agg(
+        {**{c: 'sum' for c in parts[0].columns if c != 'min_sharpe'}, 'min_sharpe': 'min'})
+    means = total.drop(columns=['windows', 'min_sharpe']).div(total['windows'], axis=0)
+    result = means.rename(columns={'sharpe': 'mean_sharpe'})
+    result['min_sharpe'] = total['min_sharpe']
+    result['windows'] = total['windows']
+    return result.sort_values('mean_sharpe', ascending=False)
+
+# ------------------------------
+# Main Execution Flow
+# ------------------------------
+def main():
+    if len(sys.argv) > 1:
+        symbols = [s.strip().upper() for s in sys.argv[1].split(',')]
+    else:
+        symbols = read_universe(UNIVERSE_FILE)
+
+    matrix = download_universe(symbols, START_DATE, date.today().isoformat(), CONSIDER_DIVIDENDS)
+    symbols = list(matrix.symbols)
+    subsets = np.array(list(combinations(range(len(symbols)), SUBSET_SIZE)))
+    num_windows = matrix.shape[0] - WINDOW_SIZE + 1
+    print(f"{len(symbols)} symbols, {len(subsets)} subsets, {num_windows} windows")
+
+    checkpoint_dir = f"universe_{SUBSET_SIZE}_{WINDOW_SIZE}_checkpoints"
+    parameters = {'symbols': symbols, 'subset_size': SUBSET_SIZE, 'window_size': WINDOW_SIZE,
+                  'start': START_DATE, 'consider_dividends': CONSIDER_DIVIDENDS}
+    with ProcessPoolExecutor(max_workers=PROCESSES, initializer=_init_worker,
+                             initargs=(matrix.values, matrix.dates, symbols, subsets, WINDOW_SIZE)) as executor:
+        # Recompute chunks whose prices were restated (adjusted closes) since they were written
+        run_chunked(checkpoint_dir, num_windows, CHUNK_SIZE, scan, parameters, executor=executor,
+                    input_fingerprint=lambda start, stop: fingerprint(matrix.days[start:stop + WINDOW_SIZE - 1],
+                                                                      matrix.values[start:stop + WINDOW_SIZE - 1]))
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(summarize(checkpoint_dir).head(TOP))
+
+if __name__ == "__main__":
+    main()
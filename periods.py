@@ -0,0 +1,33 @@
+import numpy as np
+
+# ------------------------------
+# Calendar Periods
+# ------------------------------
+def period_ends(days, frequency, complete_only=False):
+    """
+    Index of the last bar of each period and the period-end day number, for
+    bars given as int32 days since 1970-01-01 (a Thursday). 'D' keeps every
+    bar; 'W-FRI' groups Saturday..Friday weeks; 'M' groups calendar months.
+
+    With `complete_only`, a last week or month whose last weekday is after the
+    last bar is still incomplete and is dropped, like the pandas
+    `asfreq('B').ffill().asfreq('W-FRI')` of risk_parity.py does.
+    """
+    if frequency == 'D':
+        return np.arange(len(days)), days
+    if frequency == 'W-FRI':
+        key = (days.astype(np.int64) - 2) // 7
+        end_day = key * 7 + 8
+    elif frequency == 'M':
+        month = days.astype('datetime64[D]').astype('datetime64[M]')
+        key = month.astype(np.int64)
+        end_day = ((month + 1).astype('datetime64[D]') - 1).astype(np.int64)
+    else:
+        raise ValueError(f"unsupported frequency {frequency!r}")
+    last = np.flatnonzero(np.diff(key, append=key[-1] + 1))
+    ends = end_day[last].astype(np.int32)
+    if complete_only:
+        last_weekday = np.busday_offset(ends[-1].astype('datetime64[D]'), 0, roll='backward')
+        if last_weekday > days[-1].astype('datetime64[D]'):
+            last, ends = last[:-1], ends[:-1]
+    return last, ends
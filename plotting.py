@@ -0,0 +1,126 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# ------------------------------
+# Parameters Setting
+# ------------------------------
+MAX_POINTS = 2000       # points kept per line after downsampling
+MAX_MARKERS = 500       # scatter markers kept per series
+FIGSIZE = (14, 10)
+DPI = 100
+
+# matplotlib is only imported inside render(), so importing this module (or a
+# script that plots through it) costs nothing when no chart is drawn.
+
+# ------------------------------
+# Downsampling
+# ------------------------------
+def lttb(x, y, max_points=MAX_POINTS):
+    """
+    Largest-Triangle-Three-Buckets: indices of `max_points` points that keep
+    the visual shape of the line (peaks, troughs). Always keeps the first and
+    last point. `x` must be numeric and increasing, `y` finite.
+    """
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[stop:edges[i + 2]].mean(), y[stop:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (next_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def min_max(y, max_points=MAX_POINTS):
+    """
+    Indices of the minimum and maximum of each of max_points / 2 equal buckets,
+    plus the first and last point. Cheaper than LTTB and keeps every extreme.
+    """
+    n = len(y)
+    if max_points >= n:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    buckets = max(max_points // 2, 1)
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+    valid = ~np.isnan(padded).all(axis=1)
+    offsets = np.arange(buckets)[valid] * size
+    lows = offsets + np.nanargmin(padded[valid], axis=1)
+    highs = offsets + np.nanargmax(padded[valid], axis=1)
+    return np.unique(np.concatenate([[0, n - 1], lows, highs]))
+
+
+DOWNSAMPLERS = {'lttb': lambda x, y, m: lttb(x, y, m), 'min_max': lambda x, y, m: min_max(y, m)}
+
+# ------------------------------
+# Rendering
+# ------------------------------
+def render(x, panels, path=None, max_points=MAX_POINTS, method='lttb', figsize=FIGSIZE, dpi=DPI):
+    """
+    Draw stacked panels sharing the x axis, downsampling every line first.
+
+    `x` is a DatetimeIndex or datetime64 array. Each panel is a dict with
+    'title', 'ylabel', 'lines': [(label, y, plot kwargs)] and optionally
+    'markers': [(label, boolean mask, y, scatter kwargs)]. With a `path` the
+    chart is written there using the non-interactive Agg backend; without one
+    it is shown on screen.
+    """
+    import matplotlib
+    if path is not None:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    x = np.asarray(x)
+    x_numeric = x.astype('datetime64[ns]').astype(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x
+
+    fig, axes = plt.subplots(len(panels), 1, figsize=figsize, sharex=True, squeeze=False)
+    for ax, panel in zip(axes[:, 0], panels):
+        for label, y, kwargs in panel.get('lines', []):
+            y = np.asarray(y, dtype=np.float64).ravel()
+            keep = DOWNSAMPLERS[method](x_numeric, y, max_points)
+            ax.plot(x[keep], y[keep], label=label, **kwargs)
+        for label, mask, y, kwargs in panel.get('markers', []):
+            points = np.flatnonzero(np.asarray(mask).ravel())
+            if len(points) > MAX_MARKERS:
+                points = points[np.linspace(0, len(points) - 1, MAX_MARKERS).astype(np.int64)]
+            ax.scatter(x[points], np.asarray(y, dtype=np.float64).ravel()[points], label=label, **kwargs)
+        ax.set_title(panel.get('title', ''))
+        ax.set_xlabel(panel.get('xlabel', 'Date'))
+        ax.set_ylabel(panel.get('ylabel', ''))
+        ax.legend()
+        ax.grid()
+
+    fig.tight_layout()
+    if path is None:
+        plt.show()
+    else:
+        fig.savefig(path, dpi=dpi)
+    plt.close(fig)
+    return path
+
+
+def _render_job(job):
+    return render(**job)
+
+
+def render_many(jobs, processes=None):
+    """
+    Render many charts to files in worker processes. Each job is a dict of
+    `render` keyword arguments and must include 'path'. Returns the paths.
+    """
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(_render_job, jobs))
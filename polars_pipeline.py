@@ -0,0 +1,157 @@
+import numpy as np
+import polars as pl
+from price_matrix import PriceMatrix
+import cross_adx
+
+# ------------------------------
+# Polars Execution Backend
+# ------------------------------
+# Optional columnar backend for load -> align -> resample -> returns ->
+# indicators (`pip3 install polars`; nothing else in the repo imports it).
+# Every step takes and returns a LazyFrame, so a whole chain is optimized as
+# one query plan: projections and filters are pushed down into the file scan,
+# per-symbol expressions run in parallel across symbols, and no intermediate
+# frame is materialized until `collect()`.
+#
+# Prices are kept in long format, one row per (date, symbol), with the
+# columns date, symbol, close and adj_close.
+
+def scan_prices(source):
+    """
+    Lazily scan a long-format price store: a Parquet or CSV file, or a glob of
+    them (e.g. 'prices/*.parquet').
+    """
+    if source.endswith('.csv'):
+        return pl.scan_csv(source, try_parse_dates=True)
+    return pl.scan_parquet(source)
+
+
+def save_download(data, path):
+    """
+    Convert a multi-ticker `yf.download(..., auto_adjust=False)` frame into the
+    long format and write it to Parquet.
+    """
+    long = data[['Close', 'Adj Close']].stack(level='Ticker', future_stack=True).reset_index()
+    long.columns = ['date', 'symbol', 'close', 'adj_close']
+    pl.from_pandas(long.dropna(subset=['close'])).with_columns(pl.col('date').cast(pl.Date)).write_parquet(path)
+
+
+def select_prices(lf, symbols=None, start=None, end=None, consider_dividends=False):
+    """
+    Keep one price column (adj_close when dividends are considered) renamed to
+    'price', for the given symbols and [start, end) range.
+    """
+    lf = lf.select(pl.col('date').cast(pl.Date), 'symbol', pl.col('adj_close' if consider_dividends else 'close').alias('price'))
+    if symbols is not None:
+        lf = lf.filter(pl.col('symbol').is_in(symbols))
+    if start is not None:
+        lf = lf.filter(pl.col('date') >= pl.lit(start).str.to_date())
+    if end is not None:
+        lf = lf.filter(pl.col('date') < pl.lit(end).str.to_date())
+    return lf.sort('symbol', 'date')
+
+# ------------------------------
+# Resampling and Returns
+# ------------------------------
+def resample(lf, every='W-FRI'):
+    """
+    Last price of each period per symbol, labeled by the period end: 'W-FRI'
+    (weeks ending Friday, like pandas `asfreq('B').ffill().asfreq('W-FRI')`)
+    or 'M' (calendar months). 'D' returns the input unchanged. Unlike
+    pandas, the last, still incomplete period is kept.
+    """
+    if every == 'D':
+        return lf
+    if every == 'W-FRI':
+        # weekday() is 1 for Monday ... 7 for Sunday; move each day to its Friday.
+        period_end = pl.col('date') + pl.duration(days=(5 - pl.col('date').dt.weekday()) % 7)
+    elif every == 'M':
+        period_end = pl.col('date').dt.month_end()
+    else:
+        raise ValueError(f"unsupported frequency {every!r}")
+    return (lf.with_columns(period_end.alias('period'))
+              .group_by('symbol', 'period')
+              .agg(pl.col('price').sort_by('date').last())
+              .rename({'period': 'date'})
+              .sort('symbol', 'date'))
+
+
+def add_returns(lf, kind='simple', horizon=1):
+    """
+    Per-symbol `horizon`-period simple or log returns as a 'return' column.
+    """
+    ratio = pl.col('price') / pl.col('price').shift(horizon).over('symbol')
+    returns = ratio.log() if kind == 'log' else ratio - 1.0
+    return lf.with_columns(returns.alias('return'))
+
+# ------------------------------
+# Indicators
+# ------------------------------
+def add_cross_adx_signals(lf):
+    """
+    cross_adx.add_indicators + generate_signals for every symbol at once:
+    adds ma_short, ma_long, ATR, ADX and signal, and drops each symbol's first
+    2 * ADX_WINDOW rows like the pandas version.
+    """
+    window = cross_adx.ADX_WINDOW
+    alpha = 1 / window
+    price = pl.col('price')
+    prev_close = price.shift(1)
+    up_move = price - prev_close
+    down_move = prev_close - price
+    smooth = dict(alpha=alpha, adjust=True, min_samples=window)
+
+    # With closes only, high == low == close, so TR is |close - prev close|
+    # (0 on the first bar, where pandas takes the max over a lone 0).
+    tr = (price - prev_close).abs().fill_null(0.0)
+    plus_dm = pl.when((up_move > down_move) & (up_move > 0)).then(up_move).otherwise(0.0)
+    minus_dm = pl.when((down_move > up_move) & (down_move > 0)).then(down_move).otherwise(0.0)
+    atr = tr.ewm_mean(**smooth)
+    plus_di = 100 * plus_dm.ewm_mean(**smooth) / atr
+    minus_di = 100 * minus_dm.ewm_mean(**smooth) / atr
+    dx = (plus_di - minus_di).abs() / (plus_di + minus_di) * 100
+
+    lf = lf.with_columns(
+        price.rolling_mean(cross_adx.SHORT_MA_WINDOW, min_samples=1).over('symbol').alias('ma_short'),
+        price.rolling_mean(cross_adx.LONG_MA_WINDOW, min_samples=1).over('symbol').alias('ma_long'),
+        atr.over('symbol').alias('ATR'),
+        dx.rolling_mean(window, min_samples=window).over('symbol').alias('ADX'),
+    ).filter(pl.int_range(pl.len()).over('symbol') >= 2 * window)
+
+    short, long = pl.col('ma_short'), pl.col('ma_long')
+    prev_short, prev_long = short.shift(1).over('symbol'), long.shift(1).over('symbol')
+    # Polars orders NaN above every number; pandas compares it as False.
+    adx = pl.col('ADX')
+    buy = (short > long) & (prev_short <= prev_long) & adx.is_not_nan() & (adx >= cross_adx.ADX_THRESHOLD)
+    sell = (short < long) & (prev_short >= prev_long)
+    signal = pl.when(sell.fill_null(False)).then(-1).when(buy.fill_null(False)).then(1).otherwise(0)
+    return lf.with_columns(signal.alias('signal'))
+
+# ------------------------------
+# Hand-off to NumPy
+# ------------------------------
+def to_wide(lf, column='price'):
+    """
+    Collect a long frame into one row per date and one column per symbol.
+    """
+    return lf.collect().pivot(on='symbol', index='date', values=column).sort('date')
+
+
+def to_price_matrix(wide, dtype=np.float64):
+    """
+    Convert a wide frame from `to_wide` into a PriceMatrix for the allocators.
+    This is the single copy of the pipeline: columns are written once into the
+    contiguous matrix.
+    """
+    symbols = [c for c in wide.columns if c != 'date']
+    values = wide.select(symbols).to_numpy(order='c').astype(dtype, copy=False)
+    days = wide['date'].cast(pl.Int32).to_numpy()
+    return PriceMatrix(np.ascontiguousarray(values), days, symbols)
+
+
+def column(df, name):
+    """
+    One numeric column as a NumPy array; zero-copy when it has no nulls and a
+    single chunk.
+    """
+    return df[name].to_numpy()
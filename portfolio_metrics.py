@@ -0,0 +1,153 @@
+import numpy as np
+
+# ------------------------------
+# Parameters Setting
+# ------------------------------
+NUM_TRADING_DAYS_PER_YEAR = 252
+
+# Every function takes an equity curve of shape (T,) or a batch of them of
+# shape (K x T), with time on the last axis, and returns one value per curve.
+# Curves are expected to be gap free (no NaN).
+
+# ------------------------------
+# Return Metrics
+# ------------------------------
+def period_returns(equity):
+    equity = np.asarray(equity, dtype=np.float64)
+    return equity[..., 1:] / equity[..., :-1] - 1.0
+
+
+def cagr(equity, periods_per_year=NUM_TRADING_DAYS_PER_YEAR):
+    equity = np.asarray(equity, dtype=np.float64)
+    years = (equity.shape[-1] - 1) / periods_per_year
+    return (equity[..., -1] / equity[..., 0]) ** (1 / years) - 1.0
+
+
+def volatility(equity, periods_per_year=NUM_TRADING_DAYS_PER_YEAR):
+    return period_returns(equity).std(axis=-1, ddof=1) * np.sqrt(periods_per_year)
+
+
+def sharpe_ratio(equity, risk_free_rate=0.0, periods_per_year=NUM_TRADING_DAYS_PER_YEAR):
+    """
+    Annualized mean excess return over annualized volatility.
+    """
+    returns = period_returns(equity) - risk_free_rate / periods_per_year
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return returns.mean(axis=-1) / returns.std(axis=-1, ddof=1) * np.sqrt(periods_per_year)
+
+
+def sortino_ratio(equity, risk_free_rate=0.0, periods_per_year=NUM_TRADING_DAYS_PER_YEAR):
+    """
+    Annualized mean excess return over annualized downside deviation.
+    """
+    returns = period_returns(equity) - risk_free_rate / periods_per_year
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2, axis=-1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return returns.mean(axis=-1) / downside * np.sqrt(periods_per_year)
+
+
+def drawdown(equity):
+    """
+    Drawdown from the running peak at every period, <= 0.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    return equity / np.maximum.accumulate(equity, axis=-1) - 1.0
+
+
+def max_drawdown(equity):
+    return drawdown(equity).min(axis=-1)
+
+# ------------------------------
+# Position Metrics
+# ------------------------------
+# Positions are holdings in units of a single asset, (T,) or (K x T), aligned
+# with the equity curve; `prices` is (T,) or broadcastable to the positions.
+
+def traded_value(positions, prices):
+    """
+    Value traded each period. A position held on the first period counts as
+    bought on it.
+    """
+    change = np.abs(np.diff(np.asarray(positions, dtype=np.float64), axis=-1, prepend=0.0))
+    return change * np.asarray(prices, dtype=np.float64)
+
+
+def turnover(positions, prices, equity, periods_per_year=NUM_TRADING_DAYS_PER_YEAR):
+    """
+    Annual turnover: traded value per year relative to the average equity.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    years = (equity.shape[-1] - 1) / periods_per_year
+    return traded_value(positions, prices).sum(axis=-1) / equity.mean(axis=-1) / years
+
+
+def trade_statistics(positions, equity):
+    """
+    Number of trades, win rate and average trade return. A trade is a run of
+    periods with a non-zero position; its return is the equity change from
+    the close it was opened to the close it was closed (or the last period if
+    it is still open).
+
+    All curves are handled at once: the batch is flattened with a flat period
+    between curves, so runs never span two curves.
+    """
+    single = np.ndim(positions) == 1
+    positions = np.atleast_2d(np.asarray(positions))
+    equity = np.atleast_2d(np.asarray(equity, dtype=np.float64))
+    num_curves, num_periods = positions.shape
+
+    held = np.zeros((num_curves, num_periods + 2), dtype=np.int8)
+    held[:, 1:-1] = positions != 0
+    change = np.diff(held.ravel())
+    opens = np.flatnonzero(change == 1)
+    closes = np.flatnonzero(change == -1)
+
+    width = num_periods + 2
+    curve = opens // width
+    entry_period = opens % width
+    # A position closed on period t is already zero on t, so the trade is
+    # realized at that period's close.
+    exit_period = np.minimum(closes % width, num_periods - 1)
+    trade_returns = equity[curve, exit_period] / equity[curve, entry_period] - 1.0
+
+    count = np.bincount(curve, minlength=num_curves)
+    wins = np.bincount(curve, weights=trade_returns > 0, minlength=num_curves)
+    total = np.bincount(curve, weights=trade_returns, minlength=num_curves)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        win_rate = wins / count
+        average = total / count
+    if single:
+        return count[0], win_rate[0], average[0]
+    return count, win_rate, average
+
+
+def summary(equity, positions=None, prices=None, risk_free_rate=0.0, periods_per_year=NUM_TRADING_DAYS_PER_YEAR):
+    """
+    All metrics of one or K curves as a dict of name -> value (or (K,) array).
+    Position metrics are included when positions and prices are given.
+    """
+    result = {
+        'cagr': cagr(equity, periods_per_year),
+        'volatility': volatility(equity, periods_per_year),
+        'sharpe_ratio': sharpe_ratio(equity, risk_free_rate, periods_per_year),
+        'sortino_ratio': sortino_ratio(equity, risk_free_rate, periods_per_year),
+        'max_drawdown': max_drawdown(equity),
+    }
+    if positions is not None and prices is not None:
+        result['turnover'] = turnover(positions, prices, equity, periods_per_year)
+        result['trades'], result['win_rate'], result['average_trade_return'] = trade_statistics(positions, equity)
+    return result
+
+
+def format_summary(m):
+    """
+    Two-line report of one curve's `summary`; the position line is left out
+    when the summary has no position metrics.
+    """
+    lines = [f"CAGR: {m['cagr']*100:.2f}%, volatility: {m['volatility']*100:.2f}%, "
+             f"Sharpe: {m['sharpe_ratio']:.2f}, Sortino: {m['sortino_ratio']:.2f}, "
+             f"max drawdown: {m['max_drawdown']*100:.2f}%"]
+    if 'turnover' in m:
+        lines.append(f"Turnover: {m['turnover']*100:.2f}%/year, trades: {m['trades']}, "
+                     f"win rate: {m['win_rate']*100:.2f}%, average trade return: {m['average_trade_return']*100:.2f}%")
+    return '\n'.join(lines)
@@ -0,0 +1,122 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from inverse_volatility_backtest import rolling_volatility, inverse_volatility_weights
+
+# ------------------------------
+# Parameters Setting
+# ------------------------------
+VALUES_FILE = 'values.npy'
+DAYS_FILE = 'days.npy'
+SYMBOLS_FILE = 'symbols.json'
+
+# Error bounds of float32 storage against float64, checked by validate_precision
+VOLATILITY_RTOL = 1e-4    # relative error of annualized volatility
+WEIGHT_ATOL = 1e-5        # absolute error of inverse volatility weights
+
+# ------------------------------
+# Array-backed Price Container
+# ------------------------------
+class PriceMatrix:
+    """
+    Aligned prices of many symbols as one contiguous (T x N) float matrix plus
+    an int32 index of days since 1970-01-01.
+
+    Saved as plain .npy files so `load` can memory-map them: a universe of
+    thousands of symbols is paged in on demand instead of read into RAM, and
+    `values` (or a column of it) can be handed to the allocators and
+    indicators without copying. float64 is the default; float32 halves memory
+    and is opt-in. Check it with `validate_precision` first: plain volatility
+    stays well inside the bounds, but `loss_only` volatility over short windows
+    is the std of a handful of returns and can exceed them.
+    """
+
+    def __init__(self, values, days, symbols):
+        if values.shape != (len(days), len(symbols)):
+            raise ValueError(f"values shape {values.shape} does not match {len(days)} days x {len(symbols)} symbols")
+        self.values = values
+        self.days = days
+        self.symbols = list(symbols)
+
+    @classmethod
+    def from_frame(cls, df, dtype=np.float64):
+        """
+        Build from a DataFrame indexed by date with one column per symbol.
+        """
+        days = df.index.values.astype('datetime64[D]').astype(np.int32)
+        values = np.ascontiguousarray(df.values, dtype=dtype)
+        return cls(values, days, [str(c) for c in df.columns])
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        with open(os.path.join(directory, SYMBOLS_FILE)) as file:
+            symbols = json.load(file)
+        values = np.load(os.path.join(directory, VALUES_FILE), mmap_mode=mmap_mode)
+        days = np.load(os.path.join(directory, DAYS_FILE), mmap_mode=mmap_mode)
+        return cls(values, days, symbols)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, VALUES_FILE), self.values)
+        np.save(os.path.join(directory, DAYS_FILE), self.days)
+        with open(os.path.join(directory, SYMBOLS_FILE), 'w') as file:
+            json.dump(self.symbols, file)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def dates(self):
+        return self.days.astype('datetime64[D]')
+
+    def column(self, symbol):
+        """
+        Prices of one symbol as a view into the matrix.
+        """
+        return self.values[:, self.symbols.index(symbol)]
+
+    def astype(self, dtype):
+        return PriceMatrix(self.values.astype(dtype), self.days, self.symbols)
+
+    def to_frame(self):
+        """
+        DataFrame view of the matrix, indexed by date.
+        """
+        return pd.DataFrame(self.values, index=pd.DatetimeIndex(self.dates), columns=self.symbols, copy=False)
+
+    def price_frame(self, symbol):
+        """
+        Single-symbol frame with a 'price' column, the input expected by the
+        `add_indicators` functions of the trend-following scripts.
+        """
+        return pd.DataFrame({'price': self.column(symbol)}, index=pd.DatetimeIndex(self.dates))
+
+# ------------------------------
+# Precision Validation
+# ------------------------------
+def precision_error(matrix, window_size, loss_only=False):
+    """
+    Largest relative volatility error and absolute weight error of rolling
+    inverse volatility computed from float32 prices instead of float64.
+    `matrix` should hold the float64 prices before conversion.
+    """
+    exact = rolling_volatility(np.asarray(matrix.values, dtype=np.float64), window_size, loss_only)
+    approx = rolling_volatility(np.asarray(matrix.values, dtype=np.float32), window_size, loss_only)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volatility_error = np.nanmax(np.abs(approx - exact) / exact)
+    weight_error = np.nanmax(np.abs(inverse_volatility_weights(approx) - inverse_volatility_weights(exact)))
+    return volatility_error, weight_error
+
+
+def validate_precision(matrix, window_size, loss_only=False):
+    """
+    Raise ValueError if float32 storage of `matrix` moves volatilities or
+    weights by more than VOLATILITY_RTOL / WEIGHT_ATOL.
+    """
+    volatility_error, weight_error = precision_error(matrix, window_size, loss_only)
+    if volatility_error > VOLATILITY_RTOL or weight_error > WEIGHT_ATOL:
+        raise ValueError(f"float32 error too large: volatility {volatility_error:.2e} (bound {VOLATILITY_RTOL:.0e}), "
+                         f"weights {weight_error:.2e} (bound {WEIGHT_ATOL:.0e})")
+    return volatility_error, weight_error
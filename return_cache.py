@@ -0,0 +1,181 @@
+#!/usr/local/bin/python3
+
+from datetime import date
+import os
+import shutil
+import sys
+import numpy as np
+import yfinance as yf
+from periods import period_ends
+
+# ------------------------------
+# Parameters Setting
+# ------------------------------
+STORE_DIR = 'price_store'
+SYMBOLS = ['SPY', 'TLT']
+START_DATE = "2002-07-30"
+
+# Bumped when compute_returns changes, so derived files written before are rebuilt
+DERIVED_VERSION = 2
+
+# Every return series used by the scripts, as (frequency, kind, adjusted, horizon):
+VARIANTS = {
+    'inverse_volatility.py': ('D', 'simple', False, 1),
+    'inverse_volatility.py (dividends)': ('D', 'simple', True, 1),
+    'risk_parity.py': ('W-FRI', 'simple', True, 1),
+    'kelly_criterion.py': ('D', 'simple', True, 60),
+    'hierarchical_risk_parity.py': ('D', 'simple', True, 1),
+}
+
+# ------------------------------
+# Derived Series
+# ------------------------------
+def compute_returns(days, prices, frequency='D', kind='simple', horizon=1):
+    """
+    `horizon`-period simple or log returns of the last price of every period.
+    Returns (days, values), labeled by the period end. A still incomplete
+    last week or month is dropped (see `period_ends`).
+    """
+    last, ends = period_ends(days, frequency, complete_only=True)
+    prices = prices[last]
+    ratio = prices[horizon:] / prices[:-horizon]
+    values = np.log(ratio) if kind == 'log' else ratio - 1.0
+    return ends[horizon:], values
+
+# ------------------------------
+# Per-symbol Store
+# ------------------------------
+class ReturnCache:
+    """
+    Daily bars per symbol plus every derived return series computed from them.
+
+    Layout: <root>/<symbol>/bars.npz holds day numbers, close and adj_close;
+    <root>/<symbol>/derived/ holds one .npz per (frequency, kind, adjusted,
+    horizon) variant. A variant is computed the first time it is asked for and
+    then served from memory or disk. Appending bars deletes the symbol's
+    derived series, and each derived file records the bar count, last day and
+    DERIVED_VERSION it was built from, so a stale file is never served.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.memory = {}
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.root, symbol)
+
+    def bars(self, symbol):
+        path = os.path.join(self._symbol_dir(symbol), 'bars.npz')
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return {name: data[name] for name in ('days', 'close', 'adj_close')}
+
+    def last_day(self, symbol):
+        bars = self.bars(symbol)
+        return None if bars is None else bars['days'][-1].astype('datetime64[D]')
+
+    def append_bars(self, symbol, days, close, adj_close, replace=False):
+        """
+        Merge new bars into the store; bars on days already stored replace the
+        old ones, and `replace` drops the stored history altogether.
+        Invalidates the derived series of the symbol if anything changed.
+        """
+        days = np.asarray(days, dtype=np.int32)
+        new = {'days': days, 'close': np.asarray(close, dtype=np.float64),
+               'adj_close': np.asarray(adj_close, dtype=np.float64)}
+        old = self.bars(symbol)
+        if old is not None and not replace:
+            keep = ~np.isin(old['days'], days)
+            merged = {name: np.concatenate([old[name][keep], new[name]]) for name in new}
+            order = np.argsort(merged['days'], kind='stable')
+            new = {name: values[order] for name, values in merged.items()}
+        if old is not None and all(np.array_equal(old[name], new[name]) for name in new):
+            return False
+
+        directory = self._symbol_dir(symbol)
+        os.makedirs(directory, exist_ok=True)
+        shutil.rmtree(os.path.join(directory, 'derived'), ignore_errors=True)
+        self.memory = {key: value for key, value in self.memory.items() if key[0] != symbol}
+        np.savez(os.path.join(directory, 'bars.tmp.npz'), **new)
+        os.replace(os.path.join(directory, 'bars.tmp.npz'), os.path.join(directory, 'bars.npz'))
+        return True
+
+    def returns(self, symbol, frequency='D', kind='simple', adjusted=False, horizon=1):
+        """
+        (days, returns) of one variant, computed at most once per set of bars.
+        """
+        key = (symbol, frequency, kind, adjusted, horizon)
+        if key in self.memory:
+            return self.memory[key]
+
+        bars = self.bars(symbol)
+        if bars is None:
+            raise KeyError(f"no bars stored for {symbol}")
+        source = (len(bars['days']), int(bars['days'][-1]), DERIVED_VERSION)
+        directory = os.path.join(self._symbol_dir(symbol), 'derived')
+        path = os.path.join(directory, f"{frequency}_{kind}_{'adjusted' if adjusted else 'raw'}_{horizon}.npz")
+
+        result = None
+        if os.path.exists(path):
+            with np.load(path) as data:
+                if tuple(data['source']) == source:
+                    result = data['days'], data['values']
+        if result is None:
+            prices = bars['adj_close' if adjusted else 'close']
+            result = compute_returns(bars['days'], prices, frequency, kind, horizon)
+            os.makedirs(directory, exist_ok=True)
+            np.savez(path, days=result[0], values=result[1], source=np.array(source))
+
+        self.memory[key] = result
+        return result
+
+# ------------------------------
+# Download Data Function
+# ------------------------------
+def _download(symbol, start, end):
+    data = yf.download(tickers=symbol, start=start, end=end, auto_adjust=False, progress=False)
+    days = data.index.values.astype('datetime64[D]').astype(np.int32)
+    return days, np.asarray(data['Close'], dtype=float).ravel(), np.asarray(data['Adj Close'], dtype=float).ravel()
+
+
+def refresh(cache, symbol, start=START_DATE):
+    """
+    Download the bars after the last stored day and append them. The last
+    stored day is downloaded again: if its adjusted close was restated (a
+    dividend was paid), the whole history is downloaded from `start` again.
+    Only completed sessions are stored (yfinance's end date is exclusive).
+    """
+    end = date.today().isoformat()
+    stored = cache.bars(symbol)
+    if stored is None:
+        return cache.append_bars(symbol, *_download(symbol, start, end))
+
+    last = str(stored['days'][-1].astype('datetime64[D]'))
+    if last >= end:
+        return False
+    days, close, adj_close = _download(symbol, last, end)
+    if len(days) == 0:
+        return False
+    if days[0] == stored['days'][-1] and not np.isclose(adj_close[0], stored['adj_close'][-1], rtol=1e-9):
+        return cache.append_bars(symbol, *_download(symbol, start, end), replace=True)
+    return cache.append_bars(symbol, days, close, adj_close)
+
+# ------------------------------
+# Main Execution Flow
+# ------------------------------
+def main():
+    symbols = SYMBOLS
+    if len(sys.argv) > 1:
+        symbols = [s.strip().upper() for s in sys.argv[1].split(',')]
+
+    cache = ReturnCache()
+    for symbol in symbols:
+        changed = refresh(cache, symbol)
+        print(f"{symbol}: bars up to {cache.last_day(symbol)}{' (updated)' if changed else ''}")
+        for script, variant in VARIANTS.items():
+            days, values = cache.returns(symbol, *variant)
+            print(f"  {script}: {len(values)} returns, last {values[-1] * 100:.2f}% on {days[-1].astype('datetime64[D]')}")
+
+if __name__ == "__main__":
+    main()
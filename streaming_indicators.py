@@ -0,0 +1,392 @@
+#!/usr/local/bin/python3
+
+from collections import deque
+from datetime import date
+import json
+import math
+import os
+import sys
+import numpy as np
+import yfinance as yf
+import cross_adx
+import donchian_channel_breakout as donchian
+
+# ------------------------------
+# Parameters Setting
+# ------------------------------
+WATCHLIST = ['SPY', 'QQQ', 'TLT']
+STATE_FILE = 'signal_state.json'
+
+# Every indicator ingests one bar at a time through `update`, keeps only the
+# state it needs (O(window) at most) and round-trips through `to_dict` /
+# `from_dict`, so a daily run only feeds the bars since the last run instead
+# of recomputing years of history. Values match the pandas calculations in
+# cross_adx.py and donchian_channel_breakout.py, NaN included.
+
+def _divide(a, b):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.float64(a) / b)
+
+# ------------------------------
+# Building Blocks
+# ------------------------------
+class EWMMean:
+    """
+    Streaming `Series.ewm(alpha=alpha, min_periods=min_periods).mean()`
+    (adjust=True), kept as a decayed weighted sum and its total weight.
+    """
+
+    def __init__(self, alpha, min_periods=0):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.count = 0
+
+    def update(self, x):
+        decay = 1.0 - self.alpha
+        self.numerator = x + decay * self.numerator
+        self.denominator = 1.0 + decay * self.denominator
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self):
+        if self.count < max(self.min_periods, 1):
+            return math.nan
+        return self.numerator / self.denominator
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls.__new__(cls)
+        obj.__dict__.update(state)
+        return obj
+
+
+class RollingMean:
+    """
+    Streaming `Series.rolling(window, min_periods).mean()`; NaN values count
+    against `min_periods` like in pandas.
+    """
+
+    def __init__(self, window, min_periods=None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.values = deque(maxlen=window)
+
+    def update(self, x):
+        self.values.append(x)
+        return self.value
+
+    @property
+    def value(self):
+        valid = [v for v in self.values if not math.isnan(v)]
+        if len(valid) < max(self.min_periods, 1):
+            return math.nan
+        return math.fsum(valid) / len(valid)
+
+    def to_dict(self):
+        return {'window': self.window, 'min_periods': self.min_periods, 'values': list(self.values)}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state['window'], state['min_periods'])
+        obj.values.extend(state['values'])
+        return obj
+
+
+class RollingExtreme:
+    """
+    Streaming `Series.rolling(window, min_periods=1).max()` (or `.min()`) with
+    a monotonic deque: amortized O(1) per bar instead of O(window).
+    """
+
+    def __init__(self, window, mode='max'):
+        self.window = window
+        self.mode = mode
+        self.count = 0
+        self.candidates = deque()   # (bar index, value), values strictly monotonic
+
+    def update(self, x):
+        better = (lambda a, b: a >= b) if self.mode == 'max' else (lambda a, b: a <= b)
+        while self.candidates and better(x, self.candidates[-1][1]):
+            self.candidates.pop()
+        self.candidates.append((self.count, x))
+        self.count += 1
+        while self.candidates[0][0] <= self.count - 1 - self.window:
+            self.candidates.popleft()
+        return self.value
+
+    @property
+    def value(self):
+        return self.candidates[0][1] if self.candidates else math.nan
+
+    def to_dict(self):
+        return {'window': self.window, 'mode': self.mode, 'count': self.count,
+                'candidates': [list(c) for c in self.candidates]}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state['window'], state['mode'])
+        obj.count = state['count']
+        obj.candidates.extend(tuple(c) for c in state['candidates'])
+        return obj
+
+
+class Momentum:
+    """
+    Streaming `price - price.shift(window)`.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.prices = deque(maxlen=window + 1)
+
+    def update(self, price):
+        self.prices.append(price)
+        return self.value
+
+    @property
+    def value(self):
+        if len(self.prices) <= self.window:
+            return math.nan
+        return self.prices[-1] - self.prices[0]
+
+    def to_dict(self):
+        return {'window': self.window, 'prices': list(self.prices)}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state['window'])
+        obj.prices.extend(state['prices'])
+        return obj
+
+
+class ADX:
+    """
+    Streaming ATR, +DI, -DI and ADX from closing prices, as computed by
+    `cross_adx.add_indicators` (high and low are the close).
+    """
+
+    def __init__(self, window=cross_adx.ADX_WINDOW):
+        self.window = window
+        self.prev_close = math.nan
+        self.atr = EWMMean(1 / window, window)
+        self.plus_dm = EWMMean(1 / window, window)
+        self.minus_dm = EWMMean(1 / window, window)
+        self.dx = RollingMean(window, window)
+        self.plus_di = self.minus_di = self.adx = math.nan
+
+    def update(self, price):
+        if math.isnan(self.prev_close):
+            tr = up_move = down_move = 0.0
+        else:
+            tr = abs(price - self.prev_close)
+            up_move = price - self.prev_close
+            down_move = self.prev_close - price
+        self.prev_close = price
+
+        plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+        minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+        atr = self.atr.update(tr)
+        self.plus_di = 100 * _divide(self.plus_dm.update(plus_dm), atr)
+        self.minus_di = 100 * _divide(self.minus_dm.update(minus_dm), atr)
+        dx = _divide(abs(self.plus_di - self.minus_di), self.plus_di + self.minus_di) * 100
+        self.adx = self.dx.update(dx)
+        return self.adx
+
+    def to_dict(self):
+        return {'window': self.window, 'prev_close': self.prev_close,
+                'atr': self.atr.to_dict(), 'plus_dm': self.plus_dm.to_dict(),
+                'minus_dm': self.minus_dm.to_dict(), 'dx': self.dx.to_dict(),
+                'plus_di': self.plus_di, 'minus_di': self.minus_di, 'adx': self.adx}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls(state['window'])
+        obj.prev_close = state['prev_close']
+        obj.atr = EWMMean.from_dict(state['atr'])
+        obj.plus_dm = EWMMean.from_dict(state['plus_dm'])
+        obj.minus_dm = EWMMean.from_dict(state['minus_dm'])
+        obj.dx = RollingMean.from_dict(state['dx'])
+        obj.plus_di, obj.minus_di, obj.adx = state['plus_di'], state['minus_di'], state['adx']
+        return obj
+
+# ------------------------------
+# Strategy Signals
+# ------------------------------
+class CrossADXSignal:
+    """
+    Bar-by-bar version of cross_adx.py: `update(price)` returns the `signal`
+    that `generate_signals(add_indicators(df))` gives that bar (0 during the
+    warm-up rows that add_indicators drops).
+    """
+
+    kind = 'cross_adx'
+
+    def __init__(self):
+        self.count = 0
+        self.ma_short = RollingMean(cross_adx.SHORT_MA_WINDOW, 1)
+        self.ma_long = RollingMean(cross_adx.LONG_MA_WINDOW, 1)
+        self.adx = ADX(cross_adx.ADX_WINDOW)
+        self.prev_short = self.prev_long = math.nan
+        self.signal = 0
+
+    def update(self, price):
+        short = self.ma_short.update(price)
+        long = self.ma_long.update(price)
+        adx = self.adx.update(price)
+        # add_indicators drops the first 2 * ADX_WINDOW rows and the first row
+        # left has no previous row to compare with.
+        warm = self.count > 2 * cross_adx.ADX_WINDOW
+        self.signal = 0
+        if warm and short > long and self.prev_short <= self.prev_long and adx >= cross_adx.ADX_THRESHOLD:
+            self.signal = 1
+        if warm and short < long and self.prev_short >= self.prev_long:
+            self.signal = -1
+        self.prev_short, self.prev_long = short, long
+        self.count += 1
+        return self.signal
+
+    def to_dict(self):
+        return {'kind': self.kind, 'count': self.count, 'ma_short': self.ma_short.to_dict(),
+                'ma_long': self.ma_long.to_dict(), 'adx': self.adx.to_dict(),
+                'prev_short': self.prev_short, 'prev_long': self.prev_long, 'signal': self.signal}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls()
+        obj.count = state['count']
+        obj.ma_short = RollingMean.from_dict(state['ma_short'])
+        obj.ma_long = RollingMean.from_dict(state['ma_long'])
+        obj.adx = ADX.from_dict(state['adx'])
+        obj.prev_short, obj.prev_long, obj.signal = state['prev_short'], state['prev_long'], state['signal']
+        return obj
+
+
+class DonchianSignal:
+    """
+    Bar-by-bar version of donchian_channel_breakout.py: `update(price)`
+    returns the `signal` of `generate_signals(add_indicators(df))` for that bar.
+    """
+
+    kind = 'donchian'
+
+    def __init__(self):
+        self.count = 0
+        self.high = RollingExtreme(donchian.DONCHIAN_WINDOW, 'max')
+        self.low = RollingExtreme(donchian.DONCHIAN_WINDOW, 'min')
+        self.momentum = Momentum(donchian.MOMENTUM_WINDOW)
+        self.prev_high = math.nan
+        self.signal = 0
+
+    def update(self, price):
+        high = self.high.update(price)
+        self.low.update(price)
+        momentum = self.momentum.update(price)
+        # add_indicators drops the first MOMENTUM_WINDOW rows and the first
+        # row left has no previous channel value.
+        warm = self.count > donchian.MOMENTUM_WINDOW
+        self.signal = 1 if warm and price > self.prev_high and momentum > 0 else 0
+        self.prev_high = high
+        self.count += 1
+        return self.signal
+
+    def to_dict(self):
+        return {'kind': self.kind, 'count': self.count, 'high': self.high.to_dict(), 'low': self.low.to_dict(),
+                'momentum': self.momentum.to_dict(), 'prev_high': self.prev_high, 'signal': self.signal}
+
+    @classmethod
+    def from_dict(cls, state):
+        obj = cls()
+        obj.count = state['count']
+        obj.high = RollingExtreme.from_dict(state['high'])
+        obj.low = RollingExtreme.from_dict(state['low'])
+        obj.momentum = Momentum.from_dict(state['momentum'])
+        obj.prev_high, obj.signal = state['prev_high'], state['signal']
+        return obj
+
+# ------------------------------
+# State Persistence
+# ------------------------------
+SIGNALS = {cls.kind: cls for cls in (CrossADXSignal, DonchianSignal)}
+
+
+def save_states(path, states):
+    """
+    Save {symbol: {'last_date': 'YYYY-MM-DD', 'last_close': float,
+    'signals': [signal objects]}}.
+    """
+    serialized = {symbol: {'last_date': s['last_date'], 'last_close': s['last_close'],
+                           'signals': [x.to_dict() for x in s['signals']]}
+                  for symbol, s in states.items()}
+    with open(path + '.tmp', 'w') as file:
+        json.dump(serialized, file)
+    os.replace(path + '.tmp', path)
+
+
+def load_states(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        serialized = json.load(file)
+    return {symbol: {'last_date': s['last_date'], 'last_close': s.get('last_close', math.nan),
+                     'signals': [SIGNALS[x['kind']].from_dict(x) for x in s['signals']]}
+            for symbol, s in serialized.items()}
+
+# ------------------------------
+# Main Execution Flow
+# ------------------------------
+def main():
+    watchlist = WATCHLIST
+    if len(sys.argv) > 1:
+        watchlist = [s.strip().upper() for s in sys.argv[1].split(',')]
+
+    states = load_states(STATE_FILE)
+    # yfinance's end date is exclusive: only completed sessions are ingested,
+    # so a half-formed bar is never folded into the saved state.
+    end = date.today().isoformat()
+    for symbol in watchlist:
+        state = states.get(symbol)
+        if state is not None and state['last_date'] is None:
+            state = None
+        if state is not None and state['last_date'] < end:
+            # Adjusted closes are restated after a dividend. Download the last
+            # ingested bar again; if its close changed, every saved window
+            # holds stale prices and the state is rebuilt from scratch.
+            df = yf.download(symbol, start=state['last_date'], end=end, progress=False)
+            closes = np.asarray(df['Close'], dtype=float).ravel()
+            restated = len(df) > 0 and (df.index[0].date().isoformat() != state['last_date']
+                                        or not np.isclose(closes[0], state['last_close'], rtol=1e-9))
+            if restated:
+                state = None
+        else:
+            df = None
+
+        if state is None:
+            # First run for this symbol (or restated history): warm up from the
+            # same start date the batch scripts use so the EWM state matches theirs.
+            state = {'last_date': None, 'last_close': math.nan, 'signals': [CrossADXSignal(), DonchianSignal()]}
+            if cross_adx.START_DATE < end:
+                df = yf.download(symbol, start=cross_adx.START_DATE, end=end, progress=False)
+
+        if df is not None:
+            closes = np.asarray(df['Close'], dtype=float).ravel()
+            for day, price in zip(df.index, closes):
+                if state['last_date'] is not None and day.date().isoformat() <= state['last_date']:
+                    continue
+                for signal in state['signals']:
+                    signal.update(price)
+                state['last_date'], state['last_close'] = day.date().isoformat(), float(price)
+        states[symbol] = state
+
+        signals = ', '.join(f"{s.kind}: {s.signal:+d}" for s in state['signals'])
+        print(f"{symbol} as of {state['last_date']} - {signals}")
+
+    save_states(STATE_FILE, states)
+
+if __name__ == "__main__":
+    main()